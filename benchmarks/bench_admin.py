@@ -0,0 +1,68 @@
+"""Время загрузки списков публикаций и комментариев в админке.
+
+Сравнивает ModelAdmin из blog/admin.py со стандартным ModelAdmin на
+синтетической базе. Запуск:
+python benchmarks/bench_admin.py [публикаций] [комментариев на публикацию]
+"""
+import sys
+
+from common import (
+    create_dataset,
+    create_test_database,
+    measure,
+    report,
+    setup_django
+)
+
+REPEAT = 10
+
+urlpatterns = []
+
+
+def main(posts=20000, comments_per_post=10):
+    setup_django()
+    create_test_database()
+    create_dataset(posts, comments_per_post)
+
+    from django.contrib import admin
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import include, path
+
+    from blog.models import Category, Comment, Location, Post, User
+
+    default_site = admin.AdminSite(name='default_admin')
+    for model in (Category, Comment, Location, Post, User):
+        default_site.register(model, type(
+            f'Default{model.__name__}Admin',
+            (admin.ModelAdmin,),
+            {'list_display': admin.site._registry[model].list_display}
+        ))
+    urlpatterns.extend([
+        path('default-admin/', default_site.urls),
+        path('', include('blogicum.urls')),
+    ])
+    client = Client()
+    client.force_login(
+        User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+    )
+    print(f'Публикаций: {posts}, комментариев: {posts * comments_per_post}')
+    post_id = Post.objects.first().pk
+    with override_settings(ROOT_URLCONF=__name__):
+        for url in (
+            'blog/post/',
+            'blog/comment/',
+            f'blog/post/{post_id}/change/',
+        ):
+            for prefix in ('/default-admin/', '/admin/'):
+                with CaptureQueriesContext(connection) as queries:
+                    size = len(client.get(prefix + url).content)
+                report(
+                    f'{prefix}{url} ({len(queries)} запросов, {size} байт)',
+                    measure(lambda: client.get(prefix + url), REPEAT), REPEAT
+                )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,75 @@
+"""Задержка лент публикаций под ASGI: синхронные и асинхронные views.
+
+Запросы идут через AsyncClient, то есть через ASGIHandler. Запуск:
+python benchmarks/bench_async.py [публикаций] [комментариев на публикацию]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import create_dataset, create_test_database, report, setup_django
+
+REPEAT = 20
+
+urlpatterns = []
+
+
+async def measure_async(client, url, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await client.get(url)
+    return time.perf_counter() - started
+
+
+def main(posts=20000, comments_per_post=5):
+    setup_django()
+    from django.db import connection
+    # Общий кеш SQLite в памяти не даёт читать параллельно, поэтому
+    # тестовая база создаётся в файле.
+    connection.settings_dict['TEST']['NAME'] = str(
+        Path(tempfile.mkdtemp()) / 'bench_async.sqlite3'
+    )
+    create_test_database()
+    create_dataset(posts, comments_per_post)
+
+    from django.test import AsyncClient, override_settings
+    from django.urls import include, path
+
+    from blog.async_views import (
+        AsyncCategoryDetailView,
+        AsyncPostListView,
+        AsyncProfileDetailView
+    )
+    from blog.models import Category, User
+
+    urlpatterns.extend([
+        path('async/', AsyncPostListView.as_view()),
+        path('async/category/<slug:category_slug>/',
+             AsyncCategoryDetailView.as_view()),
+        path('async/profile/<str:username>/',
+             AsyncProfileDetailView.as_view()),
+        path('', include('blogicum.urls')),
+    ])
+    slug = Category.objects.first().slug
+    username = User.objects.first().username
+    client = AsyncClient()
+    print(f'Публикаций: {posts}, комментариев: {posts * comments_per_post}')
+    with override_settings(ROOT_URLCONF=__name__):
+        for url in (
+            '/?page=3',
+            f'/category/{slug}/?page=3',
+            f'/profile/{username}/?page=3',
+        ):
+            for prefix in ('', '/async'):
+                asyncio.run(measure_async(client, prefix + url, 1))
+                report(
+                    prefix + url,
+                    asyncio.run(measure_async(client, prefix + url, REPEAT)),
+                    REPEAT
+                )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,56 @@
+"""Размер страницы ленты в кеше: экземпляры модели против компактных
+записей blog.serializers, без сжатия и со сжатием.
+
+Запуск:
+python benchmarks/bench_cache_memory.py [публикаций на странице]
+"""
+import pickle
+import sys
+import time
+
+from common import create_dataset, create_test_database, setup_django
+
+REPEAT = 200
+
+
+def report(name, value, load, per_page):
+    """Размер значения в кеше (бэкенд его сериализует pickle) и время
+    получения объектов для шаблона.
+    """
+    stored = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        load(pickle.loads(stored))
+    elapsed = time.perf_counter() - started
+    print(
+        f'{name:<30} {len(stored):>8} байт'
+        f' {len(stored) // per_page:>6} байт/публикация'
+        f' {elapsed / REPEAT * 1000:>8.3f} ms/загрузка'
+    )
+
+
+def main(per_page=10):
+    setup_django()
+    create_test_database()
+    create_dataset(posts=per_page * 10, comments_per_post=1)
+
+    from django.test import override_settings
+
+    from blog.serializers import pack_posts, unpack_posts
+    from blog.utils import posts_filter
+
+    page = list(posts_filter(filter_posts=False).select_related(
+        'category', 'location'
+    )[:per_page])
+    print(f'Публикаций на странице: {per_page}')
+    report('экземпляры модели', page, list, per_page)
+    for name, threshold in (
+        ('компактные записи', sys.maxsize),
+        ('компактные записи, zlib', 0),
+    ):
+        with override_settings(CACHE_COMPRESS_THRESHOLD=threshold):
+            report(name, pack_posts(page), unpack_posts, per_page)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,61 @@
+"""Стоимость отправки комментария: перенаправление с перезагрузкой
+страницы публикации против ответа фрагментом.
+
+Запуск:
+python benchmarks/bench_comments.py [комментариев у публикации]
+"""
+import sys
+import time
+
+from common import create_test_database, setup_django
+
+REPEAT = 50
+
+
+def main(comments=200):
+    setup_django()
+    create_test_database()
+
+    from django.test import Client
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Post, User
+
+    user = User.objects.create_user('author')
+    post = Post.objects.create(
+        title='Публикация', text='Текст', author=user,
+        pub_date=timezone.now() - timezone.timedelta(days=1),
+        category=Category.objects.create(
+            title='Категория', slug='category', description='Описание'
+        ),
+    )
+    Comment.objects.bulk_create(
+        Comment(text=f'Комментарий {i}', post=post, author=user)
+        for i in range(comments)
+    )
+    client = Client()
+    client.force_login(user)
+    url = f'/posts/{post.id}/comment/'
+    print(f'Комментариев у публикации: {comments}')
+    for name, headers, follow in (
+        ('перенаправление и страница публикации', {}, True),
+        ('фрагмент HTML', {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'},
+         False),
+        ('JSON', {'HTTP_ACCEPT': 'application/json'}, False),
+    ):
+        size = 0
+        started = time.perf_counter()
+        for i in range(REPEAT):
+            response = client.post(
+                url, {'text': f'Новый {i}'}, follow=follow, **headers
+            )
+            size += len(response.content)
+        elapsed = time.perf_counter() - started
+        print(
+            f'{name:<40} {elapsed / REPEAT * 1000:>8.3f} ms/комментарий'
+            f' {size // REPEAT:>8} байт'
+        )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
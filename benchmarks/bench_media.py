@@ -0,0 +1,60 @@
+"""Запросы изображений в секунду на один воркер для режимов MEDIA_SERVE_MODE.
+
+Запуск: python benchmarks/bench_media.py [количество запросов]
+"""
+import os
+import sys
+import tempfile
+
+from common import measure, report, setup_django
+
+IMAGE_SIZE = 256 * 1024
+
+urlpatterns = []
+
+
+def main(repeat):
+    setup_django()
+    from django.test import Client, override_settings
+    from django.urls import include, path
+    from django.views.static import serve
+
+    media_root = tempfile.mkdtemp()
+    with open(os.path.join(media_root, 'image.jpg'), 'wb') as file:
+        file.write(os.urandom(IMAGE_SIZE))
+    urlpatterns.extend([
+        path(
+            'static-serve/<path:path>', serve, {'document_root': media_root}
+        ),
+        path('', include('blogicum.urls')),
+    ])
+    client = Client()
+
+    def get(url='/media/image.jpg', **headers):
+        def request():
+            response = client.get(url, **headers)
+            for _ in response:
+                pass
+        return request
+
+    with override_settings(MEDIA_ROOT=media_root, ROOT_URLCONF=__name__):
+        report(
+            'django.views.static.serve',
+            measure(get('/static-serve/image.jpg'), repeat), repeat
+        )
+        for mode in ('python', 'x-accel-redirect', 'x-sendfile'):
+            with override_settings(MEDIA_SERVE_MODE=mode):
+                report(mode, measure(get(), repeat), repeat)
+        report(
+            'python, Range: bytes=0-65535',
+            measure(get(HTTP_RANGE='bytes=0-65535'), repeat), repeat
+        )
+        etag = client.get('/media/image.jpg')['ETag']
+        report(
+            'python, If-None-Match (304)',
+            measure(get(HTTP_IF_NONE_MATCH=etag), repeat), repeat
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,67 @@
+"""Время запуска рабочего процесса и задержка первых запросов.
+
+Каждый замер выполняется в отдельном интерпретаторе: без прогрева и с
+прогревом из blog/warmup.py. Запуск:
+python benchmarks/bench_startup.py [повторов]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+URLS = ('/', '/posts/{post_id}/', '/category/{category_slug}/')
+
+
+def child(mode):
+    started = time.perf_counter()
+    from common import create_dataset, create_test_database, setup_django
+    setup_django()
+    setup = time.perf_counter() - started
+    create_test_database()
+    create_dataset(posts=100, comments_per_post=5)
+
+    from django.test import Client
+
+    from blog.models import Category, Post
+    from blog.warmup import warm_up
+
+    started = time.perf_counter()
+    if mode == 'warm':
+        warm_up()
+    warm = time.perf_counter() - started
+    kwargs = {
+        'post_id': Post.objects.first().pk,
+        'category_slug': Category.objects.first().slug,
+    }
+    client = Client()
+    result = {'setup': setup, 'warm_up': warm}
+    for url in URLS:
+        url = url.format(**kwargs)
+        for attempt in ('first', 'second'):
+            started = time.perf_counter()
+            client.get(url)
+            result[f'{url} {attempt}'] = time.perf_counter() - started
+    print(json.dumps(result))
+
+
+def main(repeat=5):
+    for mode in ('cold', 'warm'):
+        runs = [
+            json.loads(subprocess.run(
+                [sys.executable, __file__, '--child', mode],
+                check=True, capture_output=True, text=True
+            ).stdout.splitlines()[-1])
+            for _ in range(repeat)
+        ]
+        print(f'{mode}:')
+        for key in runs[0]:
+            median = statistics.median(run[key] for run in runs)
+            print(f'  {key:<40} {median * 1000:>8.1f} ms')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2])
+    else:
+        main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT_DIR / 'blogicum'
+
+
+def setup_django():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    import django
+    from django.test.utils import setup_test_environment
+    django.setup()
+    setup_test_environment()
+
+
+def measure(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return time.perf_counter() - started
+
+
+def report(name, elapsed, repeat):
+    print(
+        f'{name:<60} {repeat / elapsed:>10.1f} req/s'
+        f' {elapsed / repeat * 1000:>8.3f} ms/req'
+    )
+
+
+def create_test_database():
+    from django.db import connection
+    connection.creation.create_test_db(verbosity=0)
+
+
+def create_dataset(posts=1000, comments_per_post=10, categories=20):
+    """Заполнить базу синтетическими данными через bulk_create.
+
+    Пользователей и местоположений создаётся по одному на десять
+    публикаций.
+    """
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Location, Post, User
+
+    now = timezone.now()
+    users = locations = max(posts // 10, 1)
+    User.objects.bulk_create(
+        User(username=f'user{i}') for i in range(users)
+    )
+    Category.objects.bulk_create(
+        Category(title=f'Категория {i}', slug=f'category-{i}',
+                 description='Описание')
+        for i in range(categories)
+    )
+    Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(locations)
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    location_ids = list(Location.objects.values_list('pk', flat=True))
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f'Публикация {i}', text='Текст публикации. ' * 20,
+                pub_date=now - timezone.timedelta(minutes=i),
+                author_id=user_ids[i % users],
+                category_id=category_ids[i % categories],
+                location_id=location_ids[i % locations],
+            )
+            for i in range(posts)
+        ),
+        batch_size=1000
+    )
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                text=f'Комментарий {i}', post_id=post_ids[i % posts],
+                author_id=user_ids[i % users],
+            )
+            for i in range(posts * comments_per_post)
+        ),
+        batch_size=5000
+    )
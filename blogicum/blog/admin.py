@@ -1,7 +1,107 @@
 from django.contrib import admin
-from .models import Comment, Category, Post, Location
+from django.contrib.auth.admin import UserAdmin
 
-admin.site.register(Post)
-admin.site.register(Category)
-admin.site.register(Location)
-admin.site.register(Comment)
+from .models import Comment, Category, Post, Location, User
+from .paginators import EstimatedCountPaginator
+from .publication import set_published
+from .purge import soft_delete_post, soft_delete_user
+from .signals import reset_feeds_for_posts
+
+
+@admin.action(description='Опубликовать выбранные объекты')
+def publish(model_admin, request, queryset):
+    updated = set_published(queryset, True)
+    model_admin.message_user(request, f'Опубликовано объектов: {updated}.')
+
+
+@admin.action(description='Снять выбранные объекты с публикации')
+def unpublish(model_admin, request, queryset):
+    updated = set_published(queryset, False)
+    model_admin.message_user(
+        request, f'Снято с публикации объектов: {updated}.'
+    )
+
+
+class SoftDeleteAdminMixin:
+    """Удаление в админке только помечает объекты.
+
+    Зависимые объекты не собираются ни для страницы подтверждения, ни
+    для удаления: их пачками удаляет команда purge_deleted.
+    """
+
+    soft_delete = None
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.soft_delete(obj)
+
+
+class PublishableAdmin(admin.ModelAdmin):
+    actions = (publish, unpublish)
+
+
+class LargeTableAdmin(PublishableAdmin):
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Post)
+class PostAdmin(SoftDeleteAdminMixin, LargeTableAdmin):
+    soft_delete = staticmethod(soft_delete_post)
+    list_display = (
+        'title', 'author', 'category', 'location', 'pub_date', 'is_published'
+    )
+    list_filter = ('is_published', ('pub_date', admin.DateFieldListFilter))
+    list_select_related = ('author', 'category', 'location')
+    search_fields = ('=author__username', '^title')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('category', 'location')
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'post', 'author', 'created_at', 'is_published')
+    list_select_related = ('post', 'author')
+    search_fields = ('=author__username', '=post__id')
+    list_filter = (
+        'is_published', ('created_at', admin.DateFieldListFilter)
+    )
+    raw_id_fields = ('post', 'author')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        reset_feeds_for_posts([obj.post_id])
+
+    def delete_queryset(self, request, queryset):
+        post_ids = list(queryset.values_list('post_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        reset_feeds_for_posts(post_ids)
+
+
+@admin.register(Category)
+class CategoryAdmin(PublishableAdmin):
+    list_display = ('title', 'slug', 'is_published')
+    list_editable = ('is_published',)
+    search_fields = ('title', '=slug')
+
+
+@admin.register(Location)
+class LocationAdmin(LargeTableAdmin):
+    list_display = ('name', 'is_published')
+    search_fields = ('^name',)
+
+
+class SoftDeleteUserAdmin(SoftDeleteAdminMixin, UserAdmin):
+    soft_delete = staticmethod(soft_delete_user)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
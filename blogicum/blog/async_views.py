@@ -0,0 +1,154 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db import DatabaseError
+from django.http import Http404
+from django.views.generic import TemplateView
+
+from .degraded import breaker, get_stale_key, remember_page, stale_response
+from .lookups import get_profile, get_published_category
+from .models import Post
+from .utils import SharedPageMixin, posts_filter, run_query
+from .views import PAGINATION_BY
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_QUERY_WORKERS,
+    thread_name_prefix='blog-query'
+)
+
+
+async def gather_queries(*funcs):
+    """Выполнить независимые запросы одновременно в пуле потоков.
+
+    Каждый поток пула держит своё соединение с базой; после запроса оно
+    закрывается по тем же правилам, что и в конце HTTP-запроса.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(
+        loop.run_in_executor(executor, run_query, func) for func in funcs
+    ))
+
+
+class AsyncPostFeedView(TemplateView):
+    """Лента публикаций, в которой COUNT(*), страница и связанный объект
+    запрашиваются одновременно, а не друг за другом.
+
+    Деградация как у DegradedModeMixin; бюджет DB_TIME_BUDGET ограничивает
+    всю отрисовку, так как запросы идут в потоках пула.
+    """
+
+    paginate_by = PAGINATION_BY
+    page_kwarg = 'page'
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        return update_wrapper(async_view, view)
+
+    def get_posts(self, **options):
+        return posts_filter(**options)
+
+    def get_related_queries(self):
+        return {}
+
+    async def get(self, request, *args, **kwargs):
+        key = get_stale_key(request, True)
+        if not breaker.allow():
+            return stale_response(key)
+        try:
+            response = await asyncio.wait_for(
+                self.render_page(request, *args, **kwargs),
+                settings.DB_TIME_BUDGET
+            )
+        except (DatabaseError, asyncio.TimeoutError):
+            breaker.failure()
+            return stale_response(key)
+        breaker.success()
+        remember_page(request, key, response)
+        return response
+
+    async def render_page(self, request, *args, **kwargs):
+        posts = self.get_posts()
+        # Для подсчёта не нужны ни JOIN, ни число комментариев.
+        count = self.get_posts(
+            filter_related=False, filter_comments=False
+        ).count
+        paginator = Paginator(posts, self.paginate_by)
+        number = self.request.GET.get(self.page_kwarg) or 1
+        if number == 'last':
+            paginator.count, = await gather_queries(count)
+            number = paginator.num_pages
+        try:
+            number = int(number)
+        except ValueError:
+            raise Http404('Неверный номер страницы.')
+        offset = (number - 1) * self.paginate_by
+        related = self.get_related_queries()
+        paginator.count, page_posts, *objects = await gather_queries(
+            count,
+            lambda: list(posts[max(offset, 0):offset + self.paginate_by]),
+            *related.values()
+        )
+        try:
+            paginator.validate_number(number)
+        except InvalidPage:
+            raise Http404('Неверный номер страницы.')
+        page = paginator._get_page(page_posts, number, paginator)
+        response = self.render_to_response(self.get_context_data(
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+            object_list=page_posts,
+            **dict(zip(related, objects)),
+            **kwargs
+        ))
+        return await sync_to_async(response.render)()
+
+
+class AsyncPostListView(SharedPageMixin, AsyncPostFeedView):
+    template_name = 'blog/index.html'
+
+
+class AsyncCategoryDetailView(SharedPageMixin, AsyncPostFeedView):
+    template_name = 'blog/category.html'
+
+    def get_posts(self, **options):
+        return posts_filter(Post.objects.filter(
+            category__slug=self.kwargs['category_slug']
+        ), **options)
+
+    def get_related_queries(self):
+        return {'category': lambda: get_published_category(
+            self.kwargs['category_slug']
+        )}
+
+
+class AsyncProfileDetailView(AsyncPostFeedView):
+    template_name = 'blog/profile.html'
+
+    async def render_page(self, request, *args, **kwargs):
+        # Пользователь из сессии нужен до построения запроса публикаций.
+        self.own_profile, = await gather_queries(
+            lambda: request.user.get_username() == kwargs['username']
+        )
+        return await super().render_page(request, *args, **kwargs)
+
+    def get_posts(self, **options):
+        return posts_filter(
+            Post.objects.filter(author__username=self.kwargs['username']),
+            not self.own_profile, **options
+        )
+
+    def get_related_queries(self):
+        return {'profile': lambda: get_profile(self.kwargs['username'])}
@@ -0,0 +1,183 @@
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .lookups import LRUCache
+from .utils import run_query
+
+REFRESH_LOCK_SUFFIX = ':refresh'
+REFRESH_LOCK_TIMEOUT = 30
+GENERATION_KEY = 'blog:generation:{}'
+
+
+class Flight:
+    """Вычисление значения, которого ждут остальные потоки."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TieredCache:
+    """Кеш из двух уровней: LRU в памяти процесса перед общим бэкендом.
+
+    Записи хранятся как (значение, срок годности, время вычисления):
+    - при промахе значение вычисляет один поток процесса, остальные
+      ждут его результата (single-flight);
+    - до истечения срока запись может быть пересчитана заранее с
+      вероятностью, растущей к концу срока (XFetch), чтобы популярные
+      ключи не истекали одновременно во всех процессах;
+    - истёкшая запись ещё stale_ttl секунд отдаётся сразу, а обновляет
+      её в фоне процесс, взявший блокировку в бэкенде.
+
+    Блокировка — cache.add(): атомарна в Redis и Memcached, но в
+    FileBasedCache и LocMemCache между несколькими процессами это
+    has_key() и set(), так что изредка обновлять запись возьмутся
+    несколько процессов сразу. Внутри процесса вычисление всегда одно.
+    """
+
+    def __init__(self, alias='default', maxsize=None, local_ttl=None,
+                 stale_ttl=None, beta=None):
+        self.alias = alias
+        self.local = LRUCache(
+            maxsize or settings.TIERED_CACHE_LOCAL_SIZE,
+            settings.TIERED_CACHE_LOCAL_TTL if local_ttl is None
+            else local_ttl
+        )
+        self.stale_ttl = (
+            settings.TIERED_CACHE_STALE_TTL if stale_ttl is None
+            else stale_ttl
+        )
+        self.beta = settings.TIERED_CACHE_BETA if beta is None else beta
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='blog-cache'
+        )
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get_entry(self, key):
+        return self.local.get(key, lambda: self.backend.get(key))
+
+    def get_or_set(self, key, compute, timeout):
+        entry = self.get_entry(key)
+        if entry is None:
+            return self.single_flight(key, compute, timeout)
+        value, expires, delta = entry
+        now = time.time()
+        if now >= expires + self.stale_ttl:
+            return self.single_flight(key, compute, timeout)
+        if now < expires and not self.recompute_early(now, expires, delta):
+            return value
+        if self.lock_refresh(key):
+            if now < expires:
+                return self.refresh(key, compute, timeout)
+            self.executor.submit(
+                run_query, lambda: self.refresh(key, compute, timeout)
+            )
+        return value
+
+    def recompute_early(self, now, expires, delta):
+        return now - delta * self.beta * math.log(
+            1 - random.random()
+        ) >= expires
+
+    def lock_refresh(self, key):
+        return self.backend.add(
+            key + REFRESH_LOCK_SUFFIX, True, REFRESH_LOCK_TIMEOUT
+        )
+
+    def refresh(self, key, compute, timeout):
+        try:
+            return self.single_flight(key, compute, timeout)
+        finally:
+            self.backend.delete(key + REFRESH_LOCK_SUFFIX)
+
+    def single_flight(self, key, compute, timeout):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = self.compute(key, compute, timeout)
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.event.set()
+        return flight.value
+
+    def compute(self, key, compute, timeout):
+        started = time.time()
+        value = compute()
+        now = time.time()
+        entry = (value, now + timeout, now - started)
+        self.backend.set(key, entry, timeout + self.stale_ttl)
+        self.local.set(key, entry)
+        return value
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.backend.delete(key)
+
+    def clear_local(self):
+        self.local.clear()
+
+
+tiered_cache = TieredCache()
+
+
+def get_generations(namespaces):
+    """Текущие поколения пространств имён.
+
+    Отсутствующее (или вытесненное из кеша) поколение начинается с
+    текущего времени в наносекундах, а не с нуля, чтобы не совпасть со
+    старыми ключами.
+    """
+    backend = tiered_cache.backend
+    keys = [GENERATION_KEY.format(namespace) for namespace in namespaces]
+    generations = backend.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            backend.add(key, time.time_ns(), None)
+            generations[key] = backend.get(key)
+    return [generations[key] for key in keys]
+
+
+def versioned_key(key, namespaces):
+    """Ключ, который меняется при смене поколения любого из
+    пространств имён.
+    """
+    return f'{key}:' + '.'.join(map(str, get_generations(namespaces)))
+
+
+def bump_generations(*namespaces):
+    """Сделать недействительными все ключи пространств имён.
+
+    incr() в FileBasedCache не атомарен между процессами: одновременные
+    увеличения могут слиться в одно, но поколение всё равно меняется.
+    """
+    backend = tiered_cache.backend
+    for namespace in set(namespaces):
+        key = GENERATION_KEY.format(namespace)
+        try:
+            backend.incr(key)
+        except ValueError:
+            backend.set(key, time.time_ns(), None)
@@ -0,0 +1,120 @@
+from django import forms
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator
+
+CHOICES_CACHE_KEY = 'blog:choices:{}'
+CHOICES_TIMEOUT = 60 * 60
+
+
+def get_cache_key(model, suffix=''):
+    return CHOICES_CACHE_KEY.format(model._meta.label_lower) + suffix
+
+
+def get_choice_rows(model):
+    """Все строки таблицы-справочника в виде кортежей значений полей."""
+    key = get_cache_key(model)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(model._default_manager.values_list(
+            *[field.attname for field in model._meta.concrete_fields]
+        ))
+        cache.set(key, rows, CHOICES_TIMEOUT)
+    return rows
+
+
+def get_choice_count(model):
+    key = get_cache_key(model, ':count')
+    count = cache.get(key)
+    if count is None:
+        count = model._default_manager.count()
+        cache.set(key, count, CHOICES_TIMEOUT)
+    return count
+
+
+def invalidate_choices(model):
+    cache.delete_many([get_cache_key(model), get_cache_key(model, ':count')])
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.cached_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(get_choice_rows(self.queryset.model)) + (
+            self.field.empty_label is not None
+        )
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, который берёт варианты из кеша, а не из БД.
+
+    Подходит для полей с queryset вида Model.objects.all(): и отрисовка,
+    и проверка значения обходятся без запросов. Кеш сбрасывается
+    сигналами моделей (см. blog.signals).
+    """
+
+    iterator = CachedModelChoiceIterator
+    use_cache = True
+
+    def cached_objects(self):
+        model = self.queryset.model
+        field_names = [field.attname for field in model._meta.concrete_fields]
+        return [
+            model.from_db(self.queryset.db, field_names, row)
+            for row in get_choice_rows(model)
+        ]
+
+    def use_autocomplete(self, url):
+        self.use_cache = False
+        self.widget = AutocompleteSelect(url, self.widget.attrs)
+        self.widget.choices = self.choices
+
+    def to_python(self, value):
+        if not self.use_cache:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        for obj in self.cached_objects():
+            if str(obj.pk) == str(value):
+                return obj
+        raise forms.ValidationError(
+            self.error_messages['invalid_choice'], code='invalid_choice'
+        )
+
+
+class AutocompleteSelect(forms.Select):
+    """Select, в котором отрисован только выбранный вариант.
+
+    Остальные варианты подгружает static/js/autocomplete.js из
+    data-autocomplete-url.
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = str(self.url)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [str(item) for item in value if item not in ('', None)]
+        field = self.choices.field
+        options = [self.create_option(
+            name, '', field.empty_label or '', not selected, 0
+        )]
+        for index, obj in enumerate(
+            self.choices.queryset.filter(pk__in=selected), start=1
+        ):
+            options.append(self.create_option(
+                name, field.prepare_value(obj),
+                field.label_from_instance(obj), True, index
+            ))
+        return [(None, options, 0)]
@@ -0,0 +1,183 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+
+from pages.prerender import is_anonymous
+
+from .lookups import LRUCache
+
+STALE_PAGE_KEY = 'blog:stale:{}'
+
+
+class DatabaseBudgetExceeded(DatabaseError):
+    """Запросы страницы заняли больше DB_TIME_BUDGET секунд."""
+
+
+class CircuitBreaker:
+    """Размыкается после threshold ошибок базы подряд.
+
+    Пока цепь разомкнута, страницы не обращаются к базе; через cooldown
+    секунд один пробный запрос проверяет, закончился ли сбой.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.opened_at = time.monotonic()
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(
+    settings.CIRCUIT_BREAKER_THRESHOLD, settings.CIRCUIT_BREAKER_COOLDOWN
+)
+# Когда страница последний раз сохранялась этим процессом.
+recently_stored = LRUCache(1024, settings.STALE_PAGE_REFRESH)
+
+
+class QueryBudget:
+    """Бюджет времени базы на обработку одного запроса страницы.
+
+    Срок отсчитывается один раз при входе. Запрос к SQLite, не успевший
+    к сроку, прерывает обработчик прогресса, а ожидание заблокированной
+    базы на это время сокращается до бюджета; для остальных баз срок
+    проверяется до и после каждого запроса.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __enter__(self):
+        self.deadline = time.monotonic() + self.seconds
+        self.wrapper = connection.execute_wrapper(self)
+        self.wrapper.__enter__()
+        self.db = None
+        if connection.vendor == 'sqlite':
+            connection.ensure_connection()
+            self.db = connection.connection
+            self.busy_timeout, = self.db.execute(
+                'PRAGMA busy_timeout'
+            ).fetchone()
+            self.db.execute(
+                f'PRAGMA busy_timeout = {max(int(self.seconds * 1000), 0)}'
+            )
+            self.db.set_progress_handler(self.expired, 1000)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.db is not None and self.db is connection.connection:
+            self.db.set_progress_handler(None, 0)
+            self.db.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        self.wrapper.__exit__(*exc_info)
+
+    def expired(self):
+        return time.monotonic() > self.deadline
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.expired():
+            raise DatabaseBudgetExceeded('Бюджет времени базы исчерпан.')
+        result = execute(sql, params, many, context)
+        if self.expired():
+            raise DatabaseBudgetExceeded('Бюджет времени базы исчерпан.')
+        return result
+
+
+def get_stale_key(request, paginated=False):
+    """Ключ копии страницы: путь и, для лент, номер страницы.
+
+    Остальные параметры запроса страницу не меняют, и с ними не должны
+    появляться новые записи в кеше.
+    """
+    key = request.path
+    page = request.GET.get('page', '1')
+    if paginated and page != '1':
+        key += '?page=' + (str(int(page)) if page.isdigit() else page)
+    return STALE_PAGE_KEY.format(key)
+
+
+def store_page(key, response):
+    if recently_stored.get(key, lambda: None) is None:
+        cache.set(key, (
+            response.content, response['Content-Type'], time.time()
+        ), settings.STALE_PAGE_TIMEOUT)
+        recently_stored.set(key, True)
+
+
+def remember_page(request, key, response):
+    """Сохранить удачную отрисовку, если она одинакова для всех."""
+    if response.status_code == 200 and (
+        is_anonymous(request) or getattr(response, 'shared_page', False)
+    ):
+        store_page(key, response)
+
+
+def stale_response(key):
+    page = cache.get(key)
+    if page is None:
+        response = HttpResponse(
+            'Сервис временно недоступен.', status=503,
+            content_type='text/plain; charset=utf-8'
+        )
+        response['Retry-After'] = settings.CIRCUIT_BREAKER_COOLDOWN
+        return response
+    content, content_type, stored_at = page
+    response = HttpResponse(content, content_type=content_type)
+    response['Age'] = int(time.time() - stored_at)
+    response['Warning'] = '110 - "Response is Stale"'
+    response['Cache-Control'] = 'no-cache'
+    response.stale = True
+    return response
+
+
+class DegradedModeMixin:
+    """Отдаёт последнюю удачную отрисовку страницы, если база
+    недоступна, медленнее DB_TIME_BUDGET или цепь разомкнута.
+
+    Сохраняются только страницы, одинаковые для всех (анонимные или
+    общие), поэтому при сбое вошедший пользователь видит анонимную
+    версию.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        key = get_stale_key(
+            request, getattr(self, 'paginate_by', None) is not None
+        )
+        if not breaker.allow():
+            return stale_response(key)
+        try:
+            with QueryBudget(settings.DB_TIME_BUDGET):
+                response = super().dispatch(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+        except DatabaseError:
+            breaker.failure()
+            return stale_response(key)
+        breaker.success()
+        remember_page(request, key, response)
+        return response
@@ -0,0 +1,21 @@
+from importlib.util import find_spec
+
+from django.core import checks
+from django.db import models
+
+
+class ImageField(models.ImageField):
+    """ImageField без импорта Pillow при проверках manage.py.
+
+    Размеры фото хранятся не в модели, а в ImageBlob.
+    """
+
+    def _check_image_library_installed(self):
+        # Стандартная проверка импортирует Pillow при каждой команде
+        # manage.py; достаточно убедиться, что пакет установлен.
+        if find_spec('PIL') is None:
+            return [checks.Error(
+                'Cannot use ImageField because Pillow is not installed.',
+                obj=self, id='fields.E210',
+            )]
+        return []
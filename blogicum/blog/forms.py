@@ -1,6 +1,9 @@
 from django import forms
+from django.conf import settings
+from django.urls import reverse
 
-from .models import Post, Comment, User
+from .choices import CachedModelChoiceField, get_choice_count
+from .models import Location, Post, Comment, User
 
 
 class UserForm(forms.ModelForm):
@@ -16,6 +19,17 @@ class PostForm(forms.ModelForm):
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'})
         }
+        field_classes = {
+            'category': CachedModelChoiceField,
+            'location': CachedModelChoiceField,
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if get_choice_count(Location) > settings.POST_FORM_MAX_CHOICES:
+            self.fields['location'].use_autocomplete(
+                reverse('blog:location_autocomplete')
+            )
 
 
 class CommentForm(forms.ModelForm):
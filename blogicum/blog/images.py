@@ -0,0 +1,106 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.files.images import get_image_dimensions
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import ImageBlob, Post
+
+TEMP_UPLOAD_PREFIX = '.upload-'
+
+
+def get_image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def read_image_size(path):
+    try:
+        return get_image_dimensions(path)
+    except OSError:
+        return None, None
+
+
+def change_image_references(name, delta):
+    if not name:
+        return
+    if delta > 0:
+        blob, _ = ImageBlob.objects.get_or_create(name=name)
+        if blob.width is None:
+            blob.width, blob.height = read_image_size(
+                get_image_storage().path(name)
+            )
+            blob.save(update_fields=['width', 'height'])
+        blobs = ImageBlob.objects.filter(name=name)
+    else:
+        blobs = ImageBlob.objects.filter(name=name, ref_count__gt=0)
+    blobs.update(ref_count=F('ref_count') + delta, updated_at=timezone.now())
+
+
+def recently_used(storage, name, deadline):
+    try:
+        return storage.get_modified_time(name) >= deadline
+    except FileNotFoundError:
+        return False
+
+
+def collect_unreferenced_images(grace, names=None, dry_run=False):
+    """Удалить файлы без ссылок, не менявшиеся дольше grace секунд."""
+    storage = get_image_storage()
+    deadline = timezone.now() - timedelta(seconds=grace)
+    garbage = ImageBlob.objects.filter(ref_count=0, updated_at__lt=deadline)
+    if names is not None:
+        garbage = garbage.filter(name__in=names)
+    removed = []
+    for blob in garbage.iterator():
+        if recently_used(storage, blob.name, deadline):
+            continue
+        if not dry_run:
+            deleted, _ = ImageBlob.objects.filter(
+                pk=blob.pk, ref_count=0
+            ).delete()
+            if not deleted or recently_used(storage, blob.name, deadline):
+                continue
+            storage.delete(blob.name)
+        removed.append(blob.name)
+    return removed
+
+
+def reconcile_image_references():
+    counts = dict(
+        Post.all_objects.exclude(image='')
+        .values_list('image')
+        .annotate(references=Count('id'))
+        .order_by()
+    )
+    for name, references in counts.items():
+        ImageBlob.objects.update_or_create(
+            name=name, defaults={'ref_count': references}
+        )
+    stale = ImageBlob.objects.exclude(name__in=counts).exclude(
+        ref_count=0
+    ).update(ref_count=0, updated_at=timezone.now())
+    return len(counts), stale
+
+
+def register_orphan_images(grace):
+    storage = get_image_storage()
+    root = storage.path(Post._meta.get_field('image').upload_to)
+    known = set(ImageBlob.objects.values_list('name', flat=True))
+    known.update(Post.all_objects.values_list('image', flat=True))
+    registered = 0
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(directory, filename)
+            if filename.startswith(TEMP_UPLOAD_PREFIX):
+                if time.time() - os.path.getmtime(full_path) > grace:
+                    os.unlink(full_path)
+                continue
+            name = os.path.relpath(
+                full_path, storage.location
+            ).replace(os.sep, '/')
+            if name not in known:
+                ImageBlob.objects.get_or_create(name=name)
+                registered += 1
+    return registered
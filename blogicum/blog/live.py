@@ -0,0 +1,195 @@
+import asyncio
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from .models import Comment
+from .utils import posts_filter, run_query
+
+STREAM_PATH = re.compile(r'^/posts/(?P<post_id>\d+)/comments/stream/$')
+STREAM_URL = '/posts/{}/comments/stream/'
+KEEPALIVE_INTERVAL = 15
+RECONNECT_DELAY = 10000
+QUEUE_SIZE = 100
+
+
+class CommentHub:
+    """Раздаёт новые комментарии всем подписчикам публикации.
+
+    Подписчики — очереди asyncio в цикле событий ASGI-сервера, а
+    публикация происходит из потоков синхронного кода, поэтому события
+    передаются через call_soon_threadsafe. Хаб живёт в памяти процесса:
+    при нескольких рабочих процессах каждый раздаёт только комментарии,
+    созданные в нём самом.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(dict)
+
+    def subscribe(self, post_id):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[post_id][queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, post_id, queue):
+        with self.lock:
+            self.subscribers[post_id].pop(queue, None)
+            if not self.subscribers[post_id]:
+                del self.subscribers[post_id]
+
+    def has_subscribers(self, post_id):
+        return post_id in self.subscribers
+
+    def publish(self, post_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(post_id, {}).items())
+        for queue, loop in subscribers:
+            loop.call_soon_threadsafe(offer, queue, event)
+
+
+def offer(queue, event):
+    # Отстающий клиент теряет события, а не память сервера.
+    if not queue.full():
+        queue.put_nowait(event)
+
+
+hub = CommentHub()
+
+
+def render_comment(comment):
+    return render_to_string('includes/comment.html', {'comment': comment})
+
+
+def format_event(comment_id, html):
+    data = ''.join(f'data: {line}\n' for line in html.strip().splitlines())
+    return f'event: comment\nid: {comment_id}\n{data}\n'.encode()
+
+
+def broadcast_comment(comment):
+    """Отрисовать комментарий один раз и разослать всем подписчикам."""
+    if hub.has_subscribers(comment.post_id):
+        hub.publish(comment.post_id, (
+            comment.id, format_event(comment.id, render_comment(comment))
+        ))
+
+
+def get_stream_url(post):
+    if not settings.LIVE_COMMENTS:
+        return None
+    last_id = post.comments.filter(is_published=True).order_by(
+        '-id'
+    ).values_list('id', flat=True).first()
+    return STREAM_URL.format(post.id) + f'?after={last_id or 0}'
+
+
+def post_is_visible(post_id):
+    return posts_filter(
+        filter_related=False, filter_comments=False
+    ).filter(pk=post_id).exists()
+
+
+def missed_events(post_id, after):
+    comments = Comment.objects.filter(
+        post_id=post_id, is_published=True, id__gt=after
+    ).select_related('author').order_by('id')
+    return [
+        (comment.id, format_event(comment.id, render_comment(comment)))
+        for comment in comments
+    ]
+
+
+def get_last_event_id(scope):
+    headers = dict(scope['headers'])
+    value = headers.get(b'last-event-id', b'').decode() or parse_qs(
+        scope['query_string'].decode()
+    ).get('after', [''])[0]
+    return int(value) if value.isdigit() else None
+
+
+async def send_response(send, status, body=b''):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'text/plain; charset=utf-8'),
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def stream_events(queue, send, last_id):
+    while True:
+        try:
+            comment_id, event = await asyncio.wait_for(
+                queue.get(), KEEPALIVE_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            event = b': keepalive\n\n'
+        else:
+            if comment_id <= last_id:
+                continue
+            last_id = comment_id
+        await send({
+            'type': 'http.response.body', 'body': event, 'more_body': True
+        })
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def comment_stream(scope, receive, send, post_id):
+    """ASGI-приложение: поток Server-Sent Events с новыми комментариями.
+
+    Пропущенные с момента Last-Event-ID (или ?after=) комментарии
+    досылаются из базы, дальше события приходят из хаба.
+    """
+    if scope['method'] != 'GET':
+        return await send_response(send, 405)
+    if not await sync_to_async(run_query)(lambda: post_is_visible(post_id)):
+        return await send_response(send, 404)
+    queue = hub.subscribe(post_id)
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        last_id = get_last_event_id(scope)
+        backlog = [] if last_id is None else await sync_to_async(run_query)(
+            lambda: missed_events(post_id, last_id)
+        )
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {RECONNECT_DELAY}\n\n'.encode() + b''.join(
+                event for _, event in backlog
+            ),
+            'more_body': True,
+        })
+        last_id = max([last_id or 0] + [item[0] for item in backlog])
+        streaming = asyncio.ensure_future(stream_events(queue, send, last_id))
+        await wait_disconnect(receive)
+        streaming.cancel()
+    finally:
+        hub.unsubscribe(post_id, queue)
+
+
+def with_comment_stream(application):
+    """Обернуть ASGI-приложение Django: адреса потоков комментариев
+    обслуживаются без него, остальные запросы передаются дальше.
+    """
+
+    async def router(scope, receive, send):
+        if scope['type'] == 'http':
+            match = STREAM_PATH.match(scope['path'])
+            if match:
+                return await comment_stream(
+                    scope, receive, send, int(match['post_id'])
+                )
+        return await application(scope, receive, send)
+
+    return router
@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.query import ModelIterable
+from django.http import Http404
+
+from .models import Category, ImageBlob, Location, Post, User
+
+MISSING = object()
+
+
+class LRUCache:
+    """Ограниченный по размеру кеш в памяти процесса с временем жизни.
+
+    Изменения в других процессах сюда не доходят: устаревшая запись
+    живёт не дольше ttl секунд.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key, loader):
+        now = time.monotonic()
+        with self.lock:
+            value, expires = self.data.get(key, (MISSING, 0))
+            if value is not MISSING and expires > now:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.data[key] = (value, expires)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits, 'misses': self.misses,
+            'size': len(self.data), 'maxsize': self.maxsize,
+        }
+
+
+class MissingKeys:
+    """Ограниченное множество ключей, которых нет в базе.
+
+    Повторный запрос несуществующей страницы отвечает 404 без запроса
+    к базе. Множество очищается при создании объектов этого вида в этом
+    процессе; объекты, созданные в других процессах, становятся видны
+    не позже чем через ttl секунд.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.keys = OrderedDict()
+
+    def __contains__(self, key):
+        with self.lock:
+            expires = self.keys.get(key)
+            if expires is None:
+                return False
+            if expires > time.monotonic():
+                return True
+            del self.keys[key]
+            return False
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key):
+        with self.lock:
+            self.keys[key] = time.monotonic() + self.ttl
+            self.keys.move_to_end(key)
+            while len(self.keys) > self.maxsize:
+                self.keys.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.keys.clear()
+
+
+class KnownMissing(Http404):
+    """404 для ключа, отсутствие которого уже известно."""
+
+
+categories = LRUCache(settings.LOOKUP_CACHE_SIZE, settings.LOOKUP_CACHE_TTL)
+locations = LRUCache(settings.LOOKUP_CACHE_SIZE, settings.LOOKUP_CACHE_TTL)
+LOOKUP_CACHES = {Category: categories, Location: locations}
+MISSING_KEYS = {
+    model: MissingKeys(
+        settings.LOOKUP_MISSING_SIZE, settings.LOOKUP_MISSING_TTL
+    )
+    for model in (Category, Post, User)
+}
+
+
+def get_or_404(model, key, loader):
+    missing = MISSING_KEYS[model]
+    if key in missing:
+        raise KnownMissing('Объект не найден.')
+    obj = loader()
+    if obj is None:
+        missing.add(key)
+        raise Http404('Объект не найден.')
+    return obj
+
+
+def get_category(category_id):
+    return categories.get(
+        ('id', category_id),
+        lambda: Category.objects.filter(pk=category_id).first()
+    )
+
+
+def get_published_category(slug):
+    return get_or_404(Category, slug, lambda: categories.get(
+        ('slug', slug),
+        lambda: Category.objects.filter(is_published=True, slug=slug).first()
+    ))
+
+
+def get_profile(username):
+    """Профиль активного пользователя; удалённые отвечают 404."""
+    return get_or_404(User, username, lambda: User.objects.filter(
+        username=username, is_active=True, deletion__isnull=True
+    ).first())
+
+
+def get_post(post_id):
+    return get_or_404(
+        Post, post_id, lambda: Post.objects.filter(pk=post_id).first()
+    )
+
+
+def get_location(location_id):
+    return locations.get(
+        ('id', location_id),
+        lambda: Location.objects.filter(pk=location_id).first()
+    )
+
+
+class CachedRelationsIterable(ModelIterable):
+    """Подставляет категорию и местоположение публикации из кеша
+    вместо JOIN по этим таблицам, а размеры фото — одним запросом к
+    ImageBlob на всю выборку.
+    """
+
+    def __iter__(self):
+        posts = list(super().__iter__())
+        sizes = {
+            name: (width, height)
+            for name, width, height in ImageBlob.objects.filter(
+                name__in={post.image.name for post in posts if post.image}
+            ).values_list('name', 'width', 'height')
+        } if any(post.image for post in posts) else {}
+        for post in posts:
+            post.category = post.category_id and get_category(
+                post.category_id
+            )
+            post.location = post.location_id and get_location(
+                post.location_id
+            )
+            post.image_size = sizes.get(post.image.name, (None, None))
+            yield post
+
+
+def with_cached_relations(posts):
+    posts = posts.all()
+    posts._iterable_class = CachedRelationsIterable
+    return posts
+
+
+def invalidate_lookups(model):
+    LOOKUP_CACHES[model].clear()
+
+
+def invalidate_missing(model):
+    MISSING_KEYS[model].clear()
+
+
+def lookup_stats():
+    return {
+        **{
+            model._meta.model_name: cache.stats()
+            for model, cache in LOOKUP_CACHES.items()
+        },
+        'missing': {
+            model._meta.model_name: len(keys)
+            for model, keys in MISSING_KEYS.items()
+        },
+    }
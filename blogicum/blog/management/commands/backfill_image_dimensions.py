@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from blog.images import get_image_storage, read_image_size
+from blog.models import ImageBlob
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ширину и высоту файлов фото, где они не заданы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов; по умолчанию — число ядер.'
+        )
+
+    def handle(self, *args, batch_size, workers, **options):
+        storage = get_image_storage()
+        blobs = ImageBlob.objects.filter(width__isnull=True).order_by('pk')
+        total = blobs.count()
+        done = 0
+        last_pk = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = list(blobs.filter(pk__gt=last_pk).only(
+                    'pk', 'name'
+                )[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                paths = [storage.path(blob.name) for blob in batch]
+                for blob, (width, height) in zip(
+                    batch, executor.map(read_image_size, paths)
+                ):
+                    blob.width, blob.height = width, height
+                ImageBlob.objects.bulk_update(
+                    [blob for blob in batch if blob.width],
+                    ['width', 'height']
+                )
+                done += len(batch)
+                self.stdout.write(f'Обработано {done} из {total}')
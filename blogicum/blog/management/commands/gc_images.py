@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import (
+    collect_unreferenced_images,
+    reconcile_image_references,
+    register_orphan_images
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается ни одна '
+        'публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60 * 60,
+            help='Не удалять файлы, изменённые за последние N секунд.'
+        )
+        parser.add_argument(
+            '--reconcile', action='store_true',
+            help='Пересчитать число ссылок по таблице публикаций.'
+        )
+        parser.add_argument(
+            '--orphans', action='store_true',
+            help='Поставить на учёт файлы на диске, не известные базе.'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Работать в фоне, повторяя сборку каждые N секунд.'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        while True:
+            self.collect(**options)
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def collect(self, grace, reconcile, orphans, dry_run, **options):
+        if reconcile:
+            counted, stale = reconcile_image_references()
+            self.stdout.write(
+                f'Пересчитано файлов: {counted}, без ссылок: {stale}'
+            )
+        if orphans:
+            registered = register_orphan_images(grace)
+            self.stdout.write(f'Поставлено на учёт файлов: {registered}')
+        removed = collect_unreferenced_images(grace, dry_run=dry_run)
+        if dry_run:
+            for name in removed:
+                self.stdout.write(name)
+        self.stdout.write(f'Удалено файлов: {len(removed)}')
@@ -0,0 +1,102 @@
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+PHASE_MARKER = '-- first request --'
+CHILD_SCRIPT = '''
+import sys
+import django
+from django.test import Client
+django.setup()
+sys.stderr.write({marker!r} + '\\n')
+Client(raise_request_exception=False, SERVER_NAME={host!r}).get({url!r})
+'''
+
+ImportNode = namedtuple('ImportNode', 'name self_time cumulative children')
+
+
+def parse_importtime(lines):
+    """Построить дерево импортов из вывода python -X importtime.
+
+    Дочерние модули выводятся раньше родителя и с большим отступом,
+    поэтому узлы копятся по глубине, пока не встретится родитель.
+    """
+    pending = {}
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, indent, name = match.groups()
+        depth = len(indent) // 2
+        pending.setdefault(depth, []).append(ImportNode(
+            name, int(self_time), int(cumulative),
+            pending.pop(depth + 1, [])
+        ))
+    return pending.get(0, [])
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает дерево времени импорта модулей при django.setup() и '
+        'при обработке первого запроса в новом интерпретаторе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='/', help='Адрес первого запроса.'
+        )
+        parser.add_argument(
+            '--depth', type=int, default=2,
+            help='Глубина дерева импортов в отчёте.'
+        )
+        parser.add_argument(
+            '--min-time', type=float, default=1.0,
+            help='Не показывать модули, импортируемые быстрее N мс.'
+        )
+
+    def handle(self, *args, url, depth, min_time, **options):
+        script = CHILD_SCRIPT.format(
+            marker=PHASE_MARKER, url=url,
+            host=(settings.ALLOWED_HOSTS or ['localhost'])[0],
+        )
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, env=os.environ.copy(),
+            capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr[-2000:])
+        lines = process.stderr.splitlines()
+        split = (
+            lines.index(PHASE_MARKER) if PHASE_MARKER in lines
+            else len(lines)
+        )
+        self.min_time = min_time * 1000
+        for phase, phase_lines in (
+            ('django.setup()', lines[:split]),
+            (f'первый запрос {url}', lines[split + 1:]),
+        ):
+            roots = parse_importtime(phase_lines)
+            total = sum(node.cumulative for node in roots)
+            modules = sum(map(bool, map(IMPORT_LINE.match, phase_lines)))
+            self.stdout.write(
+                f'{phase}: {total / 1000:.1f} мс, модулей: {modules}'
+            )
+            self.write_tree(roots, depth)
+
+    def write_tree(self, nodes, depth, level=1):
+        for node in sorted(nodes, key=lambda node: -node.cumulative):
+            if node.cumulative < self.min_time:
+                return
+            self.stdout.write(
+                f'{node.cumulative / 1000:>9.1f} мс '
+                f'{"  " * level}{node.name}'
+            )
+            if level < depth:
+                self.write_tree(node.children, depth, level + 1)
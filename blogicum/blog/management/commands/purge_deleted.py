@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.purge import PURGE_BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        'Окончательно удаляет помеченные на удаление публикации и '
+        'пользователей вместе с комментариями и файлами изображений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE,
+            help='Сколько зависимых объектов удалять за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--image-grace', type=int, default=0,
+            help='Не удалять файлы, изменённые за последние N секунд.'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Работать в фоне, повторяя очистку каждые N секунд.'
+        )
+
+    def handle(self, *args, batch_size, image_grace, interval, **options):
+        while True:
+            posts, users, images = purge_deleted(
+                batch_size, image_grace, self.report_progress
+            )
+            self.stdout.write(
+                f'Удалено публикаций: {posts}, пользователей: {users}, '
+                f'файлов: {images}'
+            )
+            if not interval:
+                return
+            time.sleep(interval)
+
+    def report_progress(self, model, deleted, total):
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {deleted} из {total}'
+        )
@@ -0,0 +1,101 @@
+import os
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    WSGIRequestHandler,
+    WSGIServer,
+    get_internal_wsgi_application
+)
+
+from blog.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает WSGI-сервер с заранее созданными рабочими процессами; '
+        'каждый обслуживает запросы в одном потоке и держит соединение с '
+        'базой между запросами (CONN_MAX_AGE). Перед fork приложение '
+        'прогревается: импортируются представления, компилируются '
+        'шаблоны, строятся таблицы URL и заполняются кеши.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'addrport', nargs='?', default='127.0.0.1:8000',
+            help='Адрес и порт, по умолчанию 127.0.0.1:8000.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число рабочих процессов; по умолчанию — число ядер.'
+        )
+        parser.add_argument(
+            '--no-warm-up', action='store_false', dest='warm_up',
+            help='Не прогревать приложение перед запуском процессов.'
+        )
+
+    def handle(self, *args, addrport, workers, warm_up, **options):
+        if not hasattr(os, 'fork'):
+            raise CommandError('Команда требует поддержки os.fork().')
+        host, _, port = addrport.rpartition(':')
+        if not port.isdigit():
+            raise CommandError(f'Неверный адрес: {addrport}')
+        application = get_internal_wsgi_application()
+        if warm_up:
+            self.warm_up()
+        # Без потока на запрос соединение с базой живёт в процессе.
+        server = WSGIServer(
+            (host or '127.0.0.1', int(port)), WSGIRequestHandler
+        )
+        server.set_app(application)
+        # Процессы, проигравшие гонку за accept(), не должны блокироваться.
+        server.socket.setblocking(False)
+        self.stdout.write(
+            f'Слушаю http://{addrport}/, рабочих процессов: {workers}'
+        )
+        try:
+            self.supervise(server, workers)
+        finally:
+            server.server_close()
+
+    def warm_up(self):
+        for step, (count, elapsed) in warm_up().items():
+            self.stdout.write(
+                f'Прогрев {step}: {count} за {elapsed * 1000:.1f} мс'
+            )
+
+    def supervise(self, server, workers):
+        children = {self.spawn(server) for _ in range(workers)}
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        while children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                return
+            children.discard(pid)
+            if not stopping:
+                self.stderr.write(f'Процесс {pid} завершился, перезапускаю')
+                children.add(self.spawn(server))
+
+    def spawn(self, server):
+        pid = os.fork()
+        if pid:
+            return pid
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            server.serve_forever()
+        finally:
+            os._exit(0)
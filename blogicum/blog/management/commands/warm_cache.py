@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.warming import get_hot_urls, warm_urls
+from blog.warmup import prime_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кеш после выкладки: запрашивает самые популярные '
+        'ленты с их порциями «ещё» и публикации или заданные адреса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*',
+            help='Адреса для прогрева вместо популярных страниц.'
+        )
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько категорий, авторов и публикаций прогревать.'
+        )
+        parser.add_argument(
+            '--pages', type=int, default=1,
+            help='Сколько страниц каждой ленты прогревать.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Число одновременных запросов.'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=10,
+            help='Не больше N запросов в секунду (0 — без ограничения).'
+        )
+
+    def handle(self, *args, urls, top, pages, workers, rate, **options):
+        started = time.perf_counter()
+        prime_caches()
+        urls = urls or get_hot_urls(top, pages)
+        failed = 0
+        for url, status, elapsed in warm_urls(urls, workers, rate):
+            failed += status != 200
+            self.stdout.write(f'{status} {elapsed * 1000:>8.1f} ms {url}')
+        self.stdout.write(
+            f'Прогрето адресов: {len(urls) - failed} из {len(urls)} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
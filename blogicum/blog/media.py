@@ -0,0 +1,139 @@
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+SERVE_MODE_PYTHON = 'python'
+SERVE_MODE_X_ACCEL_REDIRECT = 'x-accel-redirect'
+SERVE_MODE_X_SENDFILE = 'x-sendfile'
+
+
+def get_media_path(path):
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not full_path.is_file():
+        raise Http404
+    return full_path
+
+
+def make_etag(stat_result):
+    return '"{:x}-{:x}"'.format(stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def parse_range(header, size):
+    """Вернуть (start, end) для одного диапазона или None.
+
+    Несколько диапазонов и некорректные заголовки игнорируются, в этом
+    случае отдаётся файл целиком. Неудовлетворимый диапазон даёт
+    ValueError.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not size:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_file_range(file, start, length, buffer_size):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(buffer_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def redirect_to_proxy(path, full_path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVE_MODE == SERVE_MODE_X_ACCEL_REDIRECT:
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_INTERNAL_URL + quote(path)
+        )
+    else:
+        response['X-Sendfile'] = str(full_path)
+    return response
+
+
+def stream_file(request, full_path, content_type, size, etag):
+    buffer_size = settings.MEDIA_SERVE_BUFFER_SIZE
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_file_range(
+                    full_path.open('rb'), start, length, buffer_size
+                ),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            return response
+    response = FileResponse(full_path.open('rb'), content_type=content_type)
+    response.block_size = buffer_size
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    full_path = get_media_path(path)
+    stat_result = full_path.stat()
+    etag = make_etag(stat_result)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat_result.st_mtime)
+    )
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+    content_type, encoding = mimetypes.guess_type(str(full_path))
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_SERVE_MODE == SERVE_MODE_PYTHON:
+        response = stream_file(
+            request, full_path, content_type, stat_result.st_size, etag
+        )
+    else:
+        response = redirect_to_proxy(path, full_path, content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat_result.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = (
+        f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    )
+    return response
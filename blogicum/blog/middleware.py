@@ -0,0 +1,148 @@
+import asyncio
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from django.utils.cache import (
+    cc_delim_re,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+STATE_COOKIES = (settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name)
+USER_CACHE_KEY = 'blog:user:{}'
+
+
+class AnonymousReadMiddleware:
+    """Короткий путь для чтения блога анонимным посетителем.
+
+    GET и HEAD к представлениям из ANONYMOUS_READ_VIEWS без cookie
+    сессии и сообщений вызываются напрямую, минуя сессии, CSRF,
+    аутентификацию и сообщения. Такой ответ не ставит cookie и
+    помечается Cache-Control: public, поэтому общий кеш перед сайтом
+    может отдавать его всем анонимам. Остальные запросы идут по полной
+    цепочке middleware; общие страницы (SharedPageMixin) и в ней
+    помечаются public и не зависят от Cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        match = self.get_match(request)
+        if match is None:
+            response = self.get_response(request)
+        else:
+            request.resolver_match = match
+            request.user = AnonymousUser()
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response = response.render()
+        shared = getattr(response, 'shared_page', False)
+        if match is None and not shared:
+            return response
+        public = (
+            response.status_code == 200 and not response.cookies
+            and not getattr(response, 'stale', False)
+        )
+        if public:
+            patch_cache_control(
+                response, public=True,
+                max_age=settings.ANONYMOUS_CACHE_MAX_AGE
+            )
+        if shared and public:
+            # Общая страница одинакова для всех: Vary: Cookie,
+            # добавленный SessionMiddleware, только мешал бы кешу.
+            response['Vary'] = ', '.join(
+                header for header in cc_delim_re.split(
+                    response.get('Vary', '')
+                ) if header and header.lower() != 'cookie'
+            )
+            if not response['Vary']:
+                del response['Vary']
+        else:
+            patch_vary_headers(response, ['Cookie'])
+        return response
+
+    def get_match(self, request):
+        if request.method not in ('GET', 'HEAD') or any(
+            name in request.COOKIES for name in STATE_COOKIES
+        ):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if (match.view_name not in settings.ANONYMOUS_READ_VIEWS
+                or asyncio.iscoroutinefunction(match.func)):
+            return None
+        return match
+
+
+def get_user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def invalidate_user(user_id):
+    cache.delete(get_user_cache_key(user_id))
+
+
+def get_cached_user(request):
+    """Пользователь сессии из кеша; из базы — только при промахе.
+
+    Запись в кеше хранит хеш аутентификации вместе с пользователем и
+    подходит только сессиям с тем же хешем: после смены пароля остальные
+    сессии, как и без кеша, проверяются по базе и сбрасываются.
+    """
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if user_id is None or session_hash is None or session.get(
+        auth.BACKEND_SESSION_KEY
+    ) not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = get_user_cache_key(user_id)
+    cached = cache.get(key)
+    if cached is not None and constant_time_compare(cached[0], session_hash):
+        return cached[1]
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(
+            key, (user.get_session_auth_hash(), user),
+            settings.AUTH_USER_CACHE_TIMEOUT
+        )
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущая пользователя из кеша."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+    def process_response(self, request, response):
+        # Метка входа для js/holes.js; request.logged_in ставят
+        # приёмники user_logged_in и user_logged_out.
+        name = settings.LOGGED_IN_COOKIE_NAME
+        logged_in = getattr(request, 'logged_in', None)
+        if logged_in is None and name in request.COOKIES and (
+            settings.SESSION_COOKIE_NAME not in request.COOKIES
+        ):
+            logged_in = False
+        if logged_in:
+            response.set_cookie(
+                name, '1', max_age=(
+                    None if settings.SESSION_EXPIRE_AT_BROWSER_CLOSE
+                    else settings.SESSION_COOKIE_AGE
+                ), secure=settings.SESSION_COOKIE_SECURE, samesite='Lax'
+            )
+        elif logged_in is False:
+            response.delete_cookie(name, samesite='Lax')
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-19 07:44
+
+import blog.fields
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_imageblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота фото'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=blog.fields.ImageField(blank=True, height_field='image_height', storage=blog.storage.ContentAddressedStorage(), upload_to='posts_images', verbose_name='Фото', width_field='image_width'),
+        ),
+    ]
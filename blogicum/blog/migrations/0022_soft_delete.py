@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-19 07:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0021_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Удалено'),
+        ),
+        migrations.CreateModel(
+            name='DeletedUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Удалён')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='deletion', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'удалённый пользователь',
+                'verbose_name_plural': 'Удалённые пользователи',
+            },
+        ),
+    ]
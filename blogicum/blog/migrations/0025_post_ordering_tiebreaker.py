@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0024_comment_is_published'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'default_related_name': '%(class)ss', 'ordering': ('-pub_date', '-pk'), 'verbose_name': 'публикация', 'verbose_name_plural': 'Публикации'},
+        ),
+    ]
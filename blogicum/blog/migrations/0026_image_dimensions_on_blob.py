@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:10
+
+import blog.fields
+import blog.storage
+from django.db import migrations, models
+
+
+def copy_dimensions(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageBlob = apps.get_model('blog', 'ImageBlob')
+    sizes = Post._base_manager.exclude(image='').filter(
+        image_width__isnull=False
+    ).values_list('image', 'image_width', 'image_height').distinct()
+    for name, width, height in sizes.iterator():
+        ImageBlob.objects.filter(name=name).update(width=width, height=height)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0025_post_ordering_tiebreaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageblob',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='imageblob',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина'),
+        ),
+        migrations.RunPython(copy_dimensions, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='post',
+            name='image_height',
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='image_width',
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=blog.fields.ImageField(blank=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts_images', verbose_name='Фото'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.functional import cached_property
+
+from .fields import ImageField
+from .storage import post_image_storage
 
 
 User = get_user_model()
@@ -49,11 +53,19 @@ class Location(PublishableModel):
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name',), name='location_name_idx'),
+        )
 
     def __str__(self):
         return self.name[:21]
 
 
+class PostManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Post(PublishableModel):
     title = models.CharField(
         max_length=256,
@@ -81,19 +93,46 @@ class Post(PublishableModel):
         null=True,
         verbose_name='Категория',
     )
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = ImageField(
+        'Фото',
+        upload_to='posts_images',
+        storage=post_image_storage,
+        blank=True
+    )
+    is_deleted = models.BooleanField(
+        'Удалено', default=False, editable=False
+    )
+
+    objects = PostManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-pk')
         default_related_name = '%(class)ss'
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(fields=('title',), name='post_title_idx'),
+        )
 
     def __str__(self):
         return self.title[:21]
 
+    @cached_property
+    def image_size(self):
+        """Ширина и высота фото из ImageBlob (или None, None).
+
+        В лентах их подставляет CachedRelationsIterable одним запросом.
+        """
+        if not self.image:
+            return None, None
+        return ImageBlob.objects.filter(name=self.image.name).values_list(
+            'width', 'height'
+        ).first() or (None, None)
 
-class Comment(models.Model):
+
+class Comment(PublishableModel):
     text = models.TextField('Текст')
     post = models.ForeignKey(
         Post,
@@ -101,9 +140,6 @@ class Comment(models.Model):
         related_name='comments',
         verbose_name='Публикация'
     )
-    created_at = models.DateTimeField(
-        auto_now_add=True
-    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -115,3 +151,43 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('created_at',), name='comment_created_at_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:21]
+
+
+class ImageBlob(models.Model):
+    name = models.CharField('Файл', max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField('Число ссылок', default=0)
+    width = models.PositiveIntegerField('Ширина', null=True, blank=True)
+    height = models.PositiveIntegerField('Высота', null=True, blank=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self):
+        return self.name
+
+
+class DeletedUser(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='deletion',
+        verbose_name='Пользователь'
+    )
+    created_at = models.DateTimeField('Удалён', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'удалённый пользователь'
+        verbose_name_plural = 'Удалённые пользователи'
+
+    def __str__(self):
+        return str(self.user)
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from .cache import tiered_cache, versioned_key
+from .serializers import pack_posts, unpack_posts
+
+COUNT_LIMIT = 10000
+
+ESTIMATE_QUERIES = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+}
+
+
+def estimate_row_count(model, using='default'):
+    """Оценить число строк в таблице модели без COUNT(*)."""
+    connection = connections[using]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] and row[0] > 0:
+            return int(row[0])
+    return model._base_manager.using(using).aggregate(
+        last=Max('pk')
+    )['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не считает все строки большой таблицы.
+
+    Без фильтров число строк оценивается по статистике СУБД (или по
+    максимальному первичному ключу), с фильтрами — считается не дальше
+    COUNT_LIMIT строк.
+    """
+
+    count_limit = COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return len(queryset)
+        if not queryset.query.where:
+            return estimate_row_count(queryset.model, queryset.db)
+        return queryset[:self.count_limit].count()
+
+
+class CachedPaginator(Paginator):
+    """Пагинатор, берущий число объектов и страницы из TieredCache.
+
+    Ключи включают поколения пространств имён namespaces, поэтому
+    изменение данных делает их недействительными без перебора. Страницы
+    публикаций хранятся в компактном виде (blog.serializers).
+    """
+
+    def __init__(self, object_list, per_page, cache_key, namespaces=(),
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = versioned_key(cache_key, namespaces)
+
+    def get_cached(self, suffix, compute):
+        return tiered_cache.get_or_set(
+            f'{self.cache_key}:{suffix}', compute,
+            settings.FEED_CACHE_TIMEOUT
+        )
+
+    @cached_property
+    def count(self):
+        return self.get_cached(
+            'count', lambda: Paginator.count.func(self)
+        )
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(unpack_posts(self.get_cached(
+            number, lambda: pack_posts(self.object_list[bottom:top])
+        )), number, self)
+
+
+class CachedPaginationMixin:
+    """Лента с CachedPaginator: ключ кеша задаёт get_feed_cache_key(),
+    пространства имён, от которых лента зависит, — get_feed_namespaces().
+    """
+
+    paginator_class = CachedPaginator
+
+    def get_feed_cache_key(self):
+        raise NotImplementedError
+
+    def get_feed_namespaces(self):
+        raise NotImplementedError
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cache_key=self.get_feed_cache_key(),
+            namespaces=self.get_feed_namespaces(), **kwargs
+        )
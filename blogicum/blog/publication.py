@@ -0,0 +1,24 @@
+from django.db import transaction
+
+from .signals import publication_changed
+
+
+def set_published(queryset, is_published):
+    """Изменить is_published у всех объектов выборки одним UPDATE.
+
+    Вместо сохранения каждого объекта отправляется один сигнал
+    publication_changed со списком изменённых первичных ключей.
+    """
+    model = queryset.model
+    changed = queryset.exclude(is_published=is_published).order_by()
+    pks = list(changed.values_list('pk', flat=True))
+    if not pks:
+        return 0
+    with transaction.atomic():
+        updated = model._base_manager.filter(
+            pk__in=changed.values('pk')
+        ).update(is_published=is_published)
+        transaction.on_commit(lambda: publication_changed.send(
+            sender=model, pks=pks, is_published=is_published
+        ))
+    return updated
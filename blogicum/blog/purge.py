@@ -0,0 +1,89 @@
+from django.db import transaction
+
+from .cache import bump_generations
+from .images import collect_unreferenced_images
+from .models import Comment, DeletedUser, Post
+from .signals import after_commit, reset_feeds_for_posts
+
+PURGE_BATCH_SIZE = 1000
+
+
+def soft_delete_post(post):
+    post.is_deleted = True
+    post.save(update_fields=['is_deleted'])
+
+
+def soft_delete_user(user):
+    """Сразу скрыть пользователя, его публикации и комментарии."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        Post.objects.filter(author=user).update(is_deleted=True)
+        Comment.objects.filter(author=user).update(is_published=False)
+        DeletedUser.objects.get_or_create(user=user)
+        # update() не отправляет post_save: публикации и число
+        # комментариев меняются во всех лентах.
+        after_commit(bump_generations, 'all')
+
+
+def delete_in_batches(queryset, batch_size, progress=None):
+    """Удалить объекты пачками, не загружая в память больше batch_size.
+
+    После каждой пачки комментариев сбрасываются ленты их публикаций.
+    """
+    total = queryset.count()
+    deleted = 0
+    while True:
+        batch = list(
+            queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted
+        objects = queryset.model._base_manager.filter(pk__in=batch)
+        post_ids = list(
+            objects.values_list('post_id', flat=True).distinct()
+        ) if queryset.model is Comment else []
+        with transaction.atomic():
+            objects.delete()
+        if post_ids:
+            reset_feeds_for_posts(post_ids)
+        deleted += len(batch)
+        if progress:
+            progress(queryset.model, deleted, total)
+
+
+def purge_post(post, batch_size=PURGE_BATCH_SIZE, progress=None):
+    delete_in_batches(post.comments.all(), batch_size, progress)
+    image = post.image.name
+    post.delete()
+    return [image] if image else []
+
+
+def purge_user(user, batch_size=PURGE_BATCH_SIZE, progress=None):
+    images = []
+    delete_in_batches(
+        Comment.objects.filter(author=user), batch_size, progress
+    )
+    for post in Post.all_objects.filter(author=user).iterator():
+        images += purge_post(post, batch_size, progress)
+    user.delete()
+    return images
+
+
+def purge_deleted(batch_size=PURGE_BATCH_SIZE, image_grace=0,
+                  progress=None):
+    """Окончательно удалить помеченные публикации и пользователей.
+
+    Возвращает число удалённых публикаций, пользователей и файлов.
+    """
+    images = []
+    posts = 0
+    for post in Post.all_objects.filter(is_deleted=True).iterator():
+        images += purge_post(post, batch_size, progress)
+        posts += 1
+    users = 0
+    for deletion in DeletedUser.objects.select_related('user').iterator():
+        images += purge_user(deletion.user, batch_size, progress)
+        users += 1
+    removed = collect_unreferenced_images(image_grace, names=images)
+    return posts, users, len(removed)
@@ -0,0 +1,79 @@
+import pickle
+import zlib
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.template.defaultfilters import truncatewords
+
+from .lookups import get_category, get_location
+from .models import Post
+
+RAW = b'\x00'
+COMPRESSED = b'\x01'
+ROW_FIELDS = (
+    'id', 'title', 'text', 'pub_date', 'is_published', 'image',
+    'image_size', 'author_id', 'username', 'category_id', 'location_id',
+    'comment_count',
+)
+# Карточка показывает только первые слова текста (post_card.html).
+CARD_TEXT_WORDS = 10
+
+
+def dump_rows(rows):
+    """Кортежи строк в байты; больше CACHE_COMPRESS_THRESHOLD — со zlib."""
+    data = pickle.dumps(rows, pickle.HIGHEST_PROTOCOL)
+    if len(data) > settings.CACHE_COMPRESS_THRESHOLD:
+        return COMPRESSED + zlib.compress(data)
+    return RAW + data
+
+
+def load_rows(data):
+    if data[:1] == COMPRESSED:
+        return pickle.loads(zlib.decompress(data[1:]))
+    return pickle.loads(data[1:])
+
+
+def pack_posts(posts):
+    """Карточки публикаций в компактном виде для кеша.
+
+    Вместо экземпляров модели с _state, полным текстом и связанными
+    объектами сохраняются кортежи полей, нужных карточке; категория и
+    местоположение при распаковке берутся из кеша справочников.
+    """
+    return dump_rows(tuple(
+        (
+            post.id, post.title, truncatewords(post.text, CARD_TEXT_WORDS),
+            post.pub_date, post.is_published, post.image.name or '',
+            post.image_size, post.author_id, post.author.username,
+            post.category_id, post.location_id, post.comment_count,
+        )
+        for post in posts
+    ))
+
+
+def unpack_posts(data):
+    return [PostRecord(row) for row in load_rows(data)]
+
+
+class PostRecord:
+    """Лёгкая замена публикации для шаблонов карточек."""
+
+    __slots__ = ROW_FIELDS + ('author', 'category', 'location')
+
+    def __init__(self, row):
+        for name, value in zip(ROW_FIELDS, row):
+            setattr(self, name, value)
+        field = Post._meta.get_field('image')
+        self.image = field.attr_class(None, field, self.image)
+        self.author = SimpleNamespace(
+            id=self.author_id, pk=self.author_id, username=self.username
+        )
+        self.category = self.category_id and get_category(self.category_id)
+        self.location = self.location_id and get_location(self.location_id)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<PostRecord: {self.id}>'
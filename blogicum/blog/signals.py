@@ -0,0 +1,159 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .cache import bump_generations
+from .choices import invalidate_choices
+from .images import change_image_references
+from .live import broadcast_comment
+from .lookups import get_category, invalidate_lookups, invalidate_missing
+from .middleware import invalidate_user
+from .models import Category, Comment, Location, Post, User
+
+# Отправляется один раз после массового изменения is_published через
+# QuerySet.update(); аргументы: sender (модель), pks, is_published.
+publication_changed = Signal()
+
+
+def after_commit(func, *args):
+    """Сбросить кеш после фиксации транзакции.
+
+    Сброс внутри транзакции позволил бы читателю закешировать ещё
+    старые строки под уже новым поколением.
+    """
+    transaction.on_commit(lambda: func(*args))
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._previous_image = instance._previous_category_id = None
+        return
+    instance._previous_image, instance._previous_category_id = (
+        sender.all_objects.filter(pk=instance.pk)
+        .values_list('image', 'category_id').first() or (None, None)
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_image', None)
+    current = instance.image.name or None
+    if previous != current:
+        change_image_references(current, 1)
+        change_image_references(previous, -1)
+
+
+@receiver(post_delete, sender=Post)
+def release_image_reference(sender, instance, **kwargs):
+    change_image_references(instance.image.name, -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_choices(sender, **kwargs):
+    after_commit(invalidate_choices, sender)
+    after_commit(invalidate_lookups, sender)
+
+
+@receiver(publication_changed, sender=Category)
+@receiver(publication_changed, sender=Location)
+def reset_choices_on_publication(sender, **kwargs):
+    invalidate_choices(sender)
+    invalidate_lookups(sender)
+    if sender is Category:
+        invalidate_missing(sender)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=User)
+def reset_missing_keys(sender, **kwargs):
+    after_commit(invalidate_missing, sender)
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.is_published:
+        transaction.on_commit(lambda: broadcast_comment(instance))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_cached_user(sender, instance, **kwargs):
+    after_commit(invalidate_user, instance.pk)
+
+
+@receiver(user_logged_in)
+def mark_logged_in(sender, request, **kwargs):
+    if request is not None:
+        request.logged_in = True
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if request is not None:
+        request.logged_in = False
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+def get_post_namespaces(author_id, *category_ids):
+    """Пространства имён кеша, в которых видна публикация."""
+    namespaces = ['feed', f'author:{author_id}']
+    for category_id in category_ids:
+        category = category_id and get_category(category_id)
+        if category:
+            namespaces.append(f'category:{category.slug}')
+    return namespaces
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_feeds(sender, instance, **kwargs):
+    after_commit(bump_generations, *get_post_namespaces(
+        instance.author_id, instance.category_id,
+        getattr(instance, '_previous_category_id', None)
+    ))
+
+
+@receiver(post_save, sender=Comment)
+def reset_comment_feeds(sender, instance, **kwargs):
+    # Удаления комментариев сбрасывают кеш там, где удаляют (вид,
+    # админка, очистка): приёмник post_delete отключил бы быстрое
+    # удаление.
+    reset_feeds_for_posts([instance.post_id])
+
+
+def reset_feeds_for_posts(post_ids):
+    """Сбросить ленты, где видны публикации post_ids: у них изменилось
+    число комментариев.
+    """
+    namespaces = []
+    for author_id, category_id in Post.all_objects.filter(
+        pk__in=post_ids
+    ).values_list('author_id', 'category_id').distinct():
+        namespaces += get_post_namespaces(author_id, category_id)
+    after_commit(bump_generations, *namespaces)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(publication_changed)
+def reset_all_feeds(sender, **kwargs):
+    after_commit(bump_generations, 'all')
+
+
+@receiver(post_save, sender=User)
+def reset_feeds_for_user(sender, instance, created, update_fields=None,
+                         **kwargs):
+    # Вход пользователя обновляет только last_login.
+    if not created and set(update_fields or ['username']) != {'last_login'}:
+        after_commit(bump_generations, 'all')
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_ALGORITHM = 'sha256'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла — хеш его содержимого.
+
+    Одинаковые загрузки сохраняются на диск один раз; учёт ссылок на
+    файлы ведёт модель ImageBlob, а удаление — команда gc_images.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def hashed_name(self, name, digest):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        directory = os.path.dirname(self.path(name))
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.new(HASH_ALGORITHM)
+        if hasattr(content, 'seek') and content.seekable():
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(
+            dir=directory, prefix='.upload-', delete=False
+        ) as temp_file:
+            try:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            except BaseException:
+                os.unlink(temp_file.name)
+                raise
+        name = self.hashed_name(name, digest.hexdigest())
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.unlink(temp_file.name)
+            os.utime(full_path)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temp_file.name, self.file_permissions_mode)
+        else:
+            os.chmod(temp_file.name, 0o666 & ~get_umask())
+        os.replace(temp_file.name, full_path)
+        return name
+
+
+def get_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+post_image_storage = ContentAddressedStorage()
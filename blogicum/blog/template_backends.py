@@ -0,0 +1,82 @@
+from importlib import import_module
+from pkgutil import walk_packages
+
+from django.apps import apps
+from django.conf import settings
+from django.template import Engine
+from django.template.backends.base import BaseEngine
+from django.template.backends.django import DjangoTemplates
+from django.template.library import import_library
+
+
+class LazyLibraries(dict):
+    """Библиотеки тегов, которые импортируются при первом {% load %}.
+
+    Как и в get_installed_libraries(), модуль без переменной register
+    библиотекой не считается и при загрузке удаляется из словаря.
+    """
+
+    def __getitem__(self, name):
+        library = super().__getitem__(name)
+        if isinstance(library, str):
+            if not hasattr(import_module(library), 'register'):
+                del self[name]
+                raise KeyError(name)
+            library = import_library(library)
+            self[name] = library
+        return library
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
+class LazyEngine(Engine):
+
+    def get_template_libraries(self, libraries):
+        return LazyLibraries(libraries)
+
+
+def get_installed_library_paths():
+    """Пути модулей templatetags всех приложений без их импорта."""
+    libraries = {}
+    candidates = ['django.templatetags'] + [
+        f'{app_config.name}.templatetags'
+        for app_config in apps.get_app_configs()
+    ]
+    for candidate in candidates:
+        try:
+            package = import_module(candidate)
+        except ImportError:
+            continue
+        for module in walk_packages(package.__path__, candidate + '.'):
+            if not module.ispkg:
+                libraries[module.name[len(candidate) + 1:]] = module.name
+    return libraries
+
+
+class LazyDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, не импортирующий библиотеки тегов при создании.
+
+    Стандартный движок при первом обращении импортирует templatetags
+    всех приложений, включая django_bootstrap5 и админку, даже если
+    шаблон их не загружает.
+    """
+
+    def __init__(self, params):
+        params = params.copy()
+        options = params.pop('OPTIONS').copy()
+        options.setdefault('autoescape', True)
+        options.setdefault('debug', settings.DEBUG)
+        options.setdefault('file_charset', 'utf-8')
+        libraries = options.get('libraries', {})
+        options['libraries'] = self.get_templatetag_libraries(libraries)
+        BaseEngine.__init__(self, params)
+        self.engine = LazyEngine(self.dirs, self.app_dirs, **options)
+
+    def get_templatetag_libraries(self, custom_libraries):
+        libraries = get_installed_library_paths()
+        libraries.update(custom_libraries)
+        return libraries
@@ -0,0 +1,251 @@
+import struct
+import zlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload,
+    TemporaryFileUploadHandler
+)
+from django.http import QueryDict
+from django.template.defaultfilters import filesizeformat
+from django.utils.datastructures import MultiValueDict
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_SOS = 0xDA
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD9)}
+JPEG_APP1 = 0xE1
+JPEG_METADATA_MARKERS = {0xED, 0xFE}
+EXIF_HEADER = b'Exif\x00\x00'
+EXIF_ORIENTATION = 0x0112
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_EXIF = b'eXIf'
+PNG_METADATA_CHUNKS = {b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+MAX_HEADER_SIZE = 256 * 1024
+
+
+def get_orientation(tiff):
+    """Значение тега Orientation из первого IFD данных EXIF (TIFF)."""
+    try:
+        byte_order = {b'II': '<', b'MM': '>'}[tiff[:2]]
+        offset, = struct.unpack(byte_order + 'I', tiff[4:8])
+        count, = struct.unpack(byte_order + 'H', tiff[offset:offset + 2])
+        for start in range(offset + 2, offset + 2 + count * 12, 12):
+            tag, value_type, _, value = struct.unpack(
+                byte_order + 'HHIH', tiff[start:start + 10]
+            )
+            if tag == EXIF_ORIENTATION and value_type == 3:
+                return value
+    except (KeyError, struct.error):
+        pass
+    return None
+
+
+def orientation_exif(tiff):
+    """EXIF только с тегом Orientation, если изображение повёрнуто."""
+    orientation = get_orientation(tiff)
+    if orientation in (None, 1):
+        return None
+    return b'MM\x00\x2a' + struct.pack(
+        '>IHHHIHHI', 8, 1, EXIF_ORIENTATION, 3, 1, orientation, 0, 0
+    )
+
+
+class MetadataStripper:
+    """Потоково вырезает EXIF, XMP, IPTC и комментарии из JPEG и PNG.
+
+    Из EXIF сохраняется только тег Orientation, чтобы повёрнутые снимки
+    с телефона показывались правильно. Данные других форматов проходят
+    без изменений.
+    """
+
+    def __init__(self):
+        self.buffer = b''
+        self.format = None
+        self.skip = 0
+        self.copy = 0
+        self.passthrough = False
+
+    def feed(self, data):
+        if self.passthrough:
+            return data
+        self.buffer += data
+        output = []
+        if self.format is None:
+            if len(self.buffer) < len(PNG_SIGNATURE):
+                return b''
+            if not self.detect_format(output):
+                return self.finish()
+        parse = self.parse_jpeg if self.format == 'jpeg' else self.parse_png
+        while self.buffer and not self.passthrough:
+            if self.skip:
+                skipped = min(self.skip, len(self.buffer))
+                self.skip -= skipped
+                self.buffer = self.buffer[skipped:]
+            elif self.copy:
+                copied = self.buffer[:self.copy]
+                self.copy -= len(copied)
+                self.buffer = self.buffer[len(copied):]
+                output.append(copied)
+            elif not parse(output):
+                break
+        if self.passthrough:
+            output.append(self.finish())
+        return b''.join(output)
+
+    def detect_format(self, output):
+        for image_format, signature in (
+            ('jpeg', JPEG_SOI), ('png', PNG_SIGNATURE)
+        ):
+            if self.buffer.startswith(signature):
+                self.format = image_format
+                output.append(signature)
+                self.buffer = self.buffer[len(signature):]
+                return True
+        return False
+
+    def finish(self):
+        self.passthrough = True
+        data, self.buffer = self.buffer, b''
+        return data
+
+    def parse_jpeg(self, output):
+        if self.buffer.startswith(b'\xff\xff'):
+            output.append(b'\xff')
+            self.buffer = self.buffer[1:]
+            return True
+        if len(self.buffer) < 2:
+            return False
+        if self.buffer[0] != 0xFF:
+            self.passthrough = True
+            return False
+        marker = self.buffer[1]
+        if marker in JPEG_STANDALONE_MARKERS:
+            self.copy = 2
+            return True
+        if marker == JPEG_SOS:
+            self.passthrough = True
+            return True
+        if len(self.buffer) < 4:
+            return False
+        length = 2 + struct.unpack('>H', self.buffer[2:4])[0]
+        if marker == JPEG_APP1:
+            return self.parse_app1(output, length)
+        if marker in JPEG_METADATA_MARKERS:
+            self.skip = length
+        else:
+            self.copy = length
+        return True
+
+    def parse_app1(self, output, length):
+        if len(self.buffer) < length:
+            return False
+        segment, self.buffer = self.buffer[4:length], self.buffer[length:]
+        exif = segment.startswith(EXIF_HEADER) and orientation_exif(
+            segment[len(EXIF_HEADER):]
+        )
+        if exif:
+            output.append(b'\xff\xe1' + struct.pack(
+                '>H', 2 + len(EXIF_HEADER) + len(exif)
+            ) + EXIF_HEADER + exif)
+        return True
+
+    def parse_png(self, output):
+        if len(self.buffer) < 8:
+            return False
+        length, chunk_type = struct.unpack('>I4s', self.buffer[:8])
+        if chunk_type == PNG_EXIF:
+            if len(self.buffer) < length + 12:
+                return False
+            exif = orientation_exif(self.buffer[8:length + 8])
+            self.buffer = self.buffer[length + 12:]
+            if exif:
+                output.append(struct.pack('>I', len(exif)) + PNG_EXIF + exif)
+                output.append(struct.pack('>I', zlib.crc32(PNG_EXIF + exif)))
+            return True
+        if chunk_type in PNG_METADATA_CHUNKS:
+            self.skip = length + 12
+        else:
+            self.copy = length + 12
+        return True
+
+
+def is_upload_too_large(request):
+    """Тело загрузки заведомо больше допустимого и не будет прочитано."""
+    return request.content_type == 'multipart/form-data' and int(
+        request.META.get('CONTENT_LENGTH') or 0
+    ) > settings.POST_IMAGE_MAX_UPLOAD_SIZE + (
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+    )
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл, соблюдая ограничения размера.
+
+    Запрос с заведомо слишком большим телом отклоняется до чтения тела;
+    файл, превысивший POST_IMAGE_MAX_UPLOAD_SIZE или
+    POST_IMAGE_MAX_PIXELS, обрывает разбор запроса. Причина сохраняется
+    в request.image_upload_error.
+    """
+
+    def handle_raw_input(self, input_data, meta, content_length, boundary,
+                         encoding=None):
+        if is_upload_too_large(self.request):
+            self.reject_size()
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.header_checked = False
+        self.stripper = MetadataStripper()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.reject_size()
+            self.abort()
+        if not self.header_checked:
+            self.check_pixels(raw_data)
+        self.file.write(self.stripper.feed(raw_data))
+
+    def file_complete(self, file_size):
+        self.file.write(self.stripper.finish())
+        self.file.size = self.file.tell()
+        self.file.seek(0)
+        return self.file
+
+    def check_pixels(self, raw_data):
+        from PIL import Image
+
+        self.header += raw_data
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            width = height = settings.POST_IMAGE_MAX_PIXELS
+        except (OSError, SyntaxError, ValueError, EOFError, struct.error):
+            if len(self.header) < MAX_HEADER_SIZE:
+                return
+            width = height = 0
+        self.header_checked = True
+        self.header = b''
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            self.request.image_upload_error = (
+                'Изображение слишком большое: не более '
+                f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.'
+            )
+            self.abort()
+
+    def reject_size(self):
+        self.request.image_upload_error = (
+            'Файл слишком большой: не более '
+            f'{filesizeformat(settings.POST_IMAGE_MAX_UPLOAD_SIZE)}.'
+        )
+
+    def abort(self):
+        if getattr(self, 'file', None) is not None:
+            self.file.close()
+        raise StopUpload(connection_reset=True)
@@ -1,7 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
+if settings.ASYNC_FEED_VIEWS:
+    from .async_views import (
+        AsyncCategoryDetailView as CategoryDetailView,
+        AsyncPostListView as PostListView,
+        AsyncProfileDetailView as ProfileDetailView
+    )
+else:
+    from .views import CategoryDetailView, PostListView, ProfileDetailView
+
 app_name = 'blog'
 
 urlpatterns = [
@@ -18,14 +28,23 @@ urlpatterns = [
          views.PostDeleteView.as_view(),
          name='delete_post'),
     path('profile/<str:username>/',
-         views.ProfileDetailView.as_view(),
+         ProfileDetailView.as_view(),
          name='profile'),
+    path('profile/<str:username>/more/',
+         views.ProfileFragmentView.as_view(),
+         name='profile_more'),
     path('profile/<str:username>/edit/',
          views.EditProfileUpdateView.as_view(),
          name='edit_profile'),
+    path('locations/autocomplete/',
+         views.LocationAutocompleteView.as_view(),
+         name='location_autocomplete'),
     path('category/<slug:category_slug>/',
-         views.CategoryDetailView.as_view(),
+         CategoryDetailView.as_view(),
          name='category_posts'),
+    path('category/<slug:category_slug>/more/',
+         views.CategoryFragmentView.as_view(),
+         name='category_posts_more'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
@@ -35,7 +54,16 @@ urlpatterns = [
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.CommentDeleteView.as_view(),
          name='delete_comment'),
+    path('holes/',
+         views.PersonalizationHolesView.as_view(),
+         name='holes'),
+    path('cache/stats/',
+         views.LookupCacheStatsView.as_view(),
+         name='cache_stats'),
+    path('more/',
+         views.PostFragmentView.as_view(),
+         name='index_more'),
     path('',
-         views.PostListView.as_view(),
+         PostListView.as_view(),
          name='index')
 ]
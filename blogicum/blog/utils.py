@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
+from django.db import close_old_connections
+from django.db.models import Count, Q
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from .lookups import with_cached_relations
 from .models import Comment, Post
+from .uploadhandlers import ImageUploadHandler, is_upload_too_large
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -25,6 +33,77 @@ class CommentDeleteUpdateMixin(OnlyAuthorMixin):
         )
 
 
+class FragmentResponseMixin:
+    """Отвечает на запросы из JavaScript фрагментом вместо перенаправления.
+
+    Accept: application/json — ответ в JSON, X-Requested-With:
+    XMLHttpRequest — только HTML комментария. Обычная отправка формы
+    по-прежнему заканчивается перенаправлением.
+    """
+
+    fragment_template = 'includes/comment.html'
+    fragment_status = 200
+
+    def get_response_format(self):
+        if 'application/json' in self.request.headers.get('Accept', ''):
+            return 'json'
+        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return 'html'
+        return None
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        response_format = self.get_response_format()
+        if response_format is None:
+            return response
+        html = render_to_string(
+            self.fragment_template, {'comment': self.object}, self.request
+        )
+        if response_format == 'json':
+            return JsonResponse(
+                {'id': self.object.id, 'html': html},
+                status=self.fragment_status
+            )
+        return HttpResponse(html, status=self.fragment_status)
+
+    def form_invalid(self, form):
+        response_format = self.get_response_format()
+        if response_format == 'json':
+            return JsonResponse(
+                {'errors': form.errors.get_json_data()}, status=400
+            )
+        if response_format == 'html':
+            return HttpResponse(form.errors.as_ul(), status=400)
+        return super().form_invalid(form)
+
+
+class SharedPageMixin:
+    """Страница, общая для всех посетителей при PERSONALIZATION_HOLES.
+
+    Личные части (шапка, кнопки автора, форма комментария) заменяются
+    пустыми «дырами», которые js/holes.js заполняет ответом
+    blog:holes. Ответ помечается shared_page: AnonymousReadMiddleware
+    разрешает хранить его в общем кеше без Vary: Cookie.
+    """
+
+    def is_shared_page(self):
+        return True
+
+    def get_holes_url(self):
+        return reverse('blog:holes')
+
+    def get_context_data(self, **kwargs):
+        if settings.PERSONALIZATION_HOLES and self.is_shared_page():
+            kwargs['holes_url'] = self.get_holes_url()
+            kwargs['holes_cookie'] = settings.LOGGED_IN_COOKIE_NAME
+        return super().get_context_data(**kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        response.shared_page = 'holes_url' in context
+        return response
+
+
 class PostDeleteUpdateMixin(LoginRequiredMixin, OnlyAuthorMixin):
     model = Post
     template_name = 'blog/create.html'
@@ -36,6 +115,27 @@ class PostDeleteUpdateMixin(LoginRequiredMixin, OnlyAuthorMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
+class ImageUploadMixin:
+    """Подключает ImageUploadHandler до того, как CSRF прочитает POST."""
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        if is_upload_too_large(request):
+            # Тело не читается, поэтому и токена CSRF в нём нет; форма
+            # получит только ошибку размера и ничего не сохранит.
+            return super().dispatch(request, *args, **kwargs)
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        error = getattr(self.request, 'image_upload_error', None)
+        if error:
+            form.full_clean()
+            form.add_error('image', error)
+        return form
+
+
 def posts_filter(posts=Post.objects,
                  filter_posts=True,
                  filter_related=True,
@@ -47,9 +147,21 @@ def posts_filter(posts=Post.objects,
             category__is_published=True
         )
     if filter_related:
-        posts = posts.select_related('author', 'category', 'location')
+        posts = with_cached_relations(posts.select_related('author'))
     if filter_comments:
         posts = posts.annotate(
-            comment_count=Count('comments')
+            comment_count=Count(
+                'comments', filter=Q(comments__is_published=True)
+            )
         ).order_by(*Post._meta.ordering)
     return posts
+
+
+def run_query(func):
+    """Выполнить func вне обработки запроса и закрыть соединения с БД,
+    как это делается в конце HTTP-запроса.
+    """
+    try:
+        return func()
+    finally:
+        close_old_connections()
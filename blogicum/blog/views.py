@@ -1,40 +1,68 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+import os
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Q
+from django.utils.cache import patch_cache_control
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
-    UpdateView
+    UpdateView,
+    View
 )
 from django.views.generic.list import MultipleObjectMixin
 
+from .cache import tiered_cache, versioned_key
+from .degraded import DegradedModeMixin
 from .forms import CommentForm, PostForm, UserForm
-from .models import Category, Comment, Post, User
+from .live import get_stream_url, post_is_visible
+from .lookups import (
+    get_post,
+    get_profile,
+    get_published_category,
+    lookup_stats
+)
+from .models import Category, Comment, Location, Post, User
+from .paginators import CachedPaginationMixin
+from .purge import soft_delete_post
+from .signals import reset_feeds_for_posts
 from .utils import (
     CommentDeleteUpdateMixin,
+    FragmentResponseMixin,
+    ImageUploadMixin,
     OnlyAuthorMixin,
     PostDeleteUpdateMixin,
+    SharedPageMixin,
     posts_filter
 )
 
 PAGINATION_BY = 10
+AUTOCOMPLETE_LIMIT = 20
 
 
-class CategoryDetailView(DetailView, MultipleObjectMixin):
+class CategoryDetailView(DegradedModeMixin, SharedPageMixin,
+                         CachedPaginationMixin, DetailView,
+                         MultipleObjectMixin):
     model = Category
     template_name = 'blog/category.html'
     slug_field = 'slug'
     slug_url_kwarg = 'category_slug'
     paginate_by = PAGINATION_BY
 
+    def get_feed_cache_key(self):
+        return f'blog:feed:category:{self.object.slug}'
+
+    def get_feed_namespaces(self):
+        return ('all', f'category:{self.object.slug}')
+
     def get_object(self, queryset=None):
-        return get_object_or_404(
-            Category,
-            is_published=True,
-            slug=self.kwargs[self.slug_url_kwarg]
-        )
+        return get_published_category(self.kwargs[self.slug_url_kwarg])
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
@@ -45,13 +73,25 @@ class CategoryDetailView(DetailView, MultipleObjectMixin):
         )
 
 
-class PostDetailView(DetailView, OnlyAuthorMixin):
+class PostDetailView(DegradedModeMixin, SharedPageMixin, DetailView,
+                     OnlyAuthorMixin):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def is_shared_page(self):
+        # Автор видит и неопубликованную публикацию; такую страницу
+        # делить нельзя.
+        return (
+            self.object.author != self.request.user
+            or post_is_visible(self.object.pk)
+        )
+
+    def get_holes_url(self):
+        return super().get_holes_url() + f'?post={self.object.pk}'
+
     def get_object(self, queryset=None):
-        post = super().get_object(queryset)
+        post = get_post(self.kwargs[self.pk_url_kwarg])
         if post.author != self.request.user:
             return get_object_or_404(posts_filter(
                 filter_related=False, filter_comments=False
@@ -61,20 +101,31 @@ class PostDetailView(DetailView, OnlyAuthorMixin):
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             form=CommentForm(),
-            comments=self.object.comments.select_related('author'),
+            comments=self.object.comments.filter(
+                is_published=True
+            ).select_related('author'),
+            live_comments_url=get_stream_url(self.object),
             **kwargs
         )
 
 
-class PostListView(ListView):
+class PostListView(DegradedModeMixin, SharedPageMixin, CachedPaginationMixin,
+                   ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = PAGINATION_BY
 
-    queryset = posts_filter()
+    def get_feed_cache_key(self):
+        return 'blog:feed:index'
+
+    def get_feed_namespaces(self):
+        return ('all', 'feed')
+
+    def get_queryset(self):
+        return posts_filter()
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -90,7 +141,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostUpdateView(PostDeleteUpdateMixin, UpdateView):
+class PostUpdateView(ImageUploadMixin, PostDeleteUpdateMixin, UpdateView):
     form_class = PostForm
 
     def get_success_url(self):
@@ -102,6 +153,11 @@ class PostUpdateView(PostDeleteUpdateMixin, UpdateView):
 
 class PostDeleteView(PostDeleteUpdateMixin, DeleteView):
 
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        soft_delete_post(self.object)
+        return redirect(self.get_success_url())
+
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             form=PostForm(instance=self.object),
@@ -115,21 +171,27 @@ class PostDeleteView(PostDeleteUpdateMixin, DeleteView):
         )
 
 
-class ProfileDetailView(DetailView, MultipleObjectMixin):
+class ProfileDetailView(DegradedModeMixin, CachedPaginationMixin, DetailView,
+                        MultipleObjectMixin):
     model = User
     template_name = 'blog/profile.html'
     slug_field = 'username'
     slug_url_kwarg = 'username'
     paginate_by = PAGINATION_BY
 
+    def get_feed_cache_key(self):
+        # Автор видит в своём профиле и неопубликованные публикации.
+        visibility = 'all' if self.object == self.request.user else 'public'
+        return f'blog:feed:profile:{self.object.pk}:{visibility}'
+
+    def get_feed_namespaces(self):
+        return ('all', f'author:{self.object.pk}')
+
     def get_object(self, queryset=None):
-        return get_object_or_404(
-            User,
-            username=self.kwargs[self.slug_url_kwarg]
-        )
+        return get_profile(self.kwargs[self.slug_url_kwarg])
 
     def get_context_data(self, **kwargs):
-        author = self.get_object()
+        author = self.object
         context = super().get_context_data(
             object_list=posts_filter(
                 author.posts,
@@ -141,6 +203,72 @@ class ProfileDetailView(DetailView, MultipleObjectMixin):
         return context
 
 
+class PostFragmentView(View):
+    """Следующие карточки ленты после публикации с id из ?cursor=.
+
+    Отвечает JSON с HTML карточек и курсором следующей порции (null,
+    если лента закончилась). Ответы кешируются в TieredCache в тех же
+    пространствах имён, что и полная страница ленты.
+    """
+
+    def get_feed(self):
+        """Имя ленты для ключа кеша, пространства имён и публикации."""
+        return 'index', ('all', 'feed'), posts_filter()
+
+    def get(self, request, *args, **kwargs):
+        feed, namespaces, posts = self.get_feed()
+        posts = posts.order_by(*Post._meta.ordering)
+        cursor = request.GET.get('cursor', '')
+        if cursor:
+            pub_date = Post.all_objects.filter(
+                pk=cursor if cursor.isdigit() else None
+            ).values_list('pub_date', flat=True).first()
+            if pub_date is None:
+                return HttpResponseBadRequest('Неверный курсор.')
+            posts = posts.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=cursor)
+            )
+        return JsonResponse(tiered_cache.get_or_set(
+            versioned_key(f'blog:fragment:{feed}:{cursor}', namespaces),
+            lambda: self.render_fragment(posts), settings.FEED_CACHE_TIMEOUT
+        ))
+
+    def render_fragment(self, posts):
+        batch = list(posts[:PAGINATION_BY + 1])
+        return {
+            'html': render_to_string('includes/post_cards.html', {
+                'posts': batch[:PAGINATION_BY], 'lazy_images': True,
+            }),
+            'next': (
+                batch[PAGINATION_BY - 1].pk if len(batch) > PAGINATION_BY
+                else None
+            ),
+        }
+
+
+class CategoryFragmentView(PostFragmentView):
+
+    def get_feed(self):
+        category = get_published_category(self.kwargs['category_slug'])
+        return (
+            f'category:{category.slug}',
+            ('all', f'category:{category.slug}'),
+            posts_filter(category.posts)
+        )
+
+
+class ProfileFragmentView(PostFragmentView):
+
+    def get_feed(self):
+        author = get_profile(self.kwargs['username'])
+        public = author != self.request.user
+        return (
+            f'profile:{author.pk}:{"public" if public else "all"}',
+            ('all', f'author:{author.pk}'),
+            posts_filter(author.posts, public)
+        )
+
+
 class EditProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserForm
@@ -157,9 +285,11 @@ class EditProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+class CommentCreateView(LoginRequiredMixin, FragmentResponseMixin,
+                        CreateView):
     model = Comment
     form_class = CommentForm
+    fragment_status = 201
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -173,9 +303,74 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class CommentUpdateView(CommentDeleteUpdateMixin, UpdateView):
+class CommentUpdateView(CommentDeleteUpdateMixin, FragmentResponseMixin,
+                        UpdateView):
     form_class = CommentForm
 
 
-class CommentDeleteView(CommentDeleteUpdateMixin, DeleteView):
-    pass
+class CommentDeleteView(CommentDeleteUpdateMixin, FragmentResponseMixin,
+                        DeleteView):
+
+    def delete(self, request, *args, **kwargs):
+        response = super().delete(request, *args, **kwargs)
+        reset_feeds_for_posts([self.object.post_id])
+        response_format = self.get_response_format()
+        if response_format == 'json':
+            return JsonResponse({'id': self.kwargs['comment_id']})
+        if response_format == 'html':
+            return HttpResponse(status=204)
+        return response
+
+
+class LocationAutocompleteView(LoginRequiredMixin, View):
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        locations = Location.objects.filter(
+            is_published=True, name__istartswith=query
+        ).values_list('id', 'name')[:AUTOCOMPLETE_LIMIT]
+        response = JsonResponse({'results': [
+            {'id': location_id, 'text': name}
+            for location_id, name in locations
+        ]})
+        response['Cache-Control'] = 'private, max-age=60'
+        return response
+
+
+class LookupCacheStatsView(UserPassesTestMixin, View):
+    """Счётчики кеша справочников текущего рабочего процесса."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return JsonResponse({'pid': os.getpid(), **lookup_stats()})
+
+
+class PersonalizationHolesView(View):
+    """Личные части общей страницы для текущего пользователя."""
+
+    def get(self, request):
+        holes = {'header': render_to_string(
+            'includes/header.html', request=request
+        )}
+        post_id = request.GET.get('post', '')
+        post = request.user.is_authenticated and post_id.isdigit() and (
+            Post.objects.filter(pk=post_id).first()
+        )
+        if post:
+            holes['comment_form'] = render_to_string(
+                'includes/comment_form.html',
+                {'post': post, 'form': CommentForm()}, request
+            )
+            if post.author_id == request.user.id:
+                holes['post_controls'] = render_to_string(
+                    'includes/post_controls.html', {'post': post}
+                )
+            for comment in post.comments.filter(author=request.user):
+                holes[f'comment_controls:{comment.id}'] = render_to_string(
+                    'includes/comment_controls.html', {'comment': comment}
+                )
+        response = JsonResponse(holes)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+
+from .models import Category, Post, User
+from .utils import posts_filter, run_query
+from .views import PAGINATION_BY
+
+
+def get_feed_urls(page_url, more_url, posts, pages):
+    """Существующие страницы ленты и порции «ещё» после каждой из них."""
+    ids = list(posts.order_by(*Post._meta.ordering).values_list(
+        'pk', flat=True
+    )[:PAGINATION_BY * pages + 1])
+    urls = [page_url]
+    for page in range(1, pages + 1):
+        if len(ids) <= PAGINATION_BY * page:
+            break
+        urls.append(f'{more_url}?cursor={ids[PAGINATION_BY * page - 1]}')
+        if page < pages:
+            urls.append(f'{page_url}?page={page + 1}')
+    return urls
+
+
+def get_hot_urls(top=10, pages=1):
+    """Адреса страниц и фрагментов, которые первыми понадобятся
+    посетителям.
+
+    Журнала обращений нет, поэтому популярность оценивается по данным:
+    категории и авторы — по числу видимых публикаций, публикации — по
+    числу комментариев. Ленты прогреваются на pages страниц вглубь
+    вместе с порциями «ещё», которые подгружаются после каждой.
+    """
+    visible = posts_filter(filter_related=False, filter_comments=False)
+    feeds = [(reverse('blog:index'), reverse('blog:index_more'), visible)]
+    feeds += [
+        (
+            reverse('blog:category_posts', args=[slug]),
+            reverse('blog:category_posts_more', args=[slug]),
+            visible.filter(category__slug=slug)
+        )
+        for slug in Category.objects.filter(is_published=True).annotate(
+            visible=Count('posts', filter=Q(posts__in=visible))
+        ).filter(visible__gt=0).order_by('-visible').values_list(
+            'slug', flat=True
+        )[:top]
+    ]
+    feeds += [
+        (
+            reverse('blog:profile', args=[username]),
+            reverse('blog:profile_more', args=[username]),
+            visible.filter(author__username=username)
+        )
+        for username in User.objects.filter(
+            is_active=True, deletion__isnull=True
+        ).annotate(
+            visible=Count('posts', filter=Q(posts__in=visible))
+        ).filter(visible__gt=0).order_by('-visible').values_list(
+            'username', flat=True
+        )[:top]
+    ]
+    urls = [
+        url for page_url, more_url, posts in feeds
+        for url in get_feed_urls(page_url, more_url, posts, pages)
+    ]
+    urls += [
+        reverse('blog:post_detail', args=[post_id])
+        for post_id in visible.annotate(
+            comments_count=Count(
+                'comments', filter=Q(comments__is_published=True)
+            )
+        ).order_by('-comments_count').values_list('id', flat=True)[:top]
+    ]
+    return urls
+
+
+class RateLimiter:
+    """Не больше rate запросов в секунду на все потоки вместе."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def warm_urls(urls, workers=2, rate=0):
+    """Запросить адреса анонимно в workers потоках.
+
+    Ответы заполняют общий кеш лент и последние удачные копии страниц.
+    Возвращает [(адрес, статус, секунд)] в порядке адресов.
+    """
+    limiter = RateLimiter(rate)
+    local = threading.local()
+
+    def fetch(url):
+        limiter.wait()
+        if not hasattr(local, 'client'):
+            local.client = Client(
+                raise_request_exception=False,
+                SERVER_NAME=settings.ALLOWED_HOSTS[0]
+            )
+        started = time.perf_counter()
+        status = run_query(lambda: local.client.get(url).status_code)
+        return url, status, time.perf_counter() - started
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix='blog-warm'
+    ) as executor:
+        return list(executor.map(fetch, urls))
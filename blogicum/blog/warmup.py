@@ -0,0 +1,100 @@
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import NoReverseMatch, get_resolver, reverse
+from django.utils import translation
+from django.utils.module_loading import module_has_submodule
+
+from pages.views import prerender_pages
+
+from .choices import get_choice_count, get_choice_rows
+from .models import Category, Location
+
+
+def import_views():
+    modules = []
+    for app_config in apps.get_app_configs():
+        if module_has_submodule(app_config.module, 'views'):
+            modules.append(import_module(f'{app_config.name}.views'))
+    return len(modules)
+
+
+def compile_templates():
+    """Скомпилировать шаблоны из каталогов DIRS всех движков.
+
+    При DEBUG = False шаблоны попадают в кеш cached.Loader и не
+    разбираются повторно.
+    """
+    compiled = 0
+    for engine in engines.all():
+        for directory in map(Path, engine.dirs):
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                compiled += 1
+    return compiled
+
+
+def resolve_urls(resolver=None, namespace=''):
+    """Построить таблицы обратного разрешения для всех пространств имён.
+
+    Имена без параметров дополнительно разрешаются через reverse().
+    """
+    resolver = resolver or get_resolver()
+    resolved = 0
+    for name in list(resolver.reverse_dict):
+        if not isinstance(name, str):
+            continue
+        try:
+            reverse(namespace + name)
+        except NoReverseMatch:
+            continue
+        resolved += 1
+    for key, (prefix, sub_resolver) in list(resolver.namespace_dict.items()):
+        resolved += resolve_urls(sub_resolver, f'{namespace}{key}:')
+    return resolved
+
+
+def load_translations():
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('')
+    translation.deactivate()
+    return 1
+
+
+def prime_caches():
+    for model in (Category, Location):
+        get_choice_rows(model)
+        get_choice_count(model)
+    return 2
+
+
+WARM_UP_STEPS = (
+    ('views', import_views),
+    ('templates', compile_templates),
+    ('urls', resolve_urls),
+    ('translations', load_translations),
+    ('caches', prime_caches),
+    ('pages', prerender_pages),
+)
+
+
+def warm_up(steps=WARM_UP_STEPS):
+    """Выполнить шаги прогрева, вернуть {шаг: (объектов, секунд)}.
+
+    Соединения с базой, открытые для прогрева кешей, закрываются:
+    их нельзя передавать процессам, созданным через fork.
+    """
+    timings = {}
+    try:
+        for name, step in steps:
+            started = time.perf_counter()
+            count = step()
+            timings[name] = (count, time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    return timings
@@ -5,3 +5,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+from blog.live import with_comment_stream  # noqa: E402
+
+application = with_comment_stream(application)
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,20 +37,135 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'blog.middleware.AnonymousReadMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сессии читаются из кеша и только при промахе из базы; пользователь
+# сессии кешируется на AUTH_USER_CACHE_TIMEOUT секунд.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
+
+# Представления, которые анонимный читатель получает в обход сессий,
+# CSRF и аутентификации (blog.middleware), и сколько секунд их ответы
+# можно хранить в общем кеше.
+ANONYMOUS_READ_VIEWS = (
+    'blog:index',
+    'blog:index_more',
+    'blog:category_posts',
+    'blog:category_posts_more',
+    'blog:profile',
+    'blog:profile_more',
+    'blog:post_detail',
+)
+
+ANONYMOUS_CACHE_MAX_AGE = 60
+
+# Ленты и страницы публикаций отдаются всем одинаковыми, а личные части
+# подгружаются отдельным запросом (blog:holes); такие ответы общий кеш
+# хранит и для вошедших пользователей.
+PERSONALIZATION_HOLES = os.getenv('PERSONALIZATION_HOLES', '') == '1'
+
+# Cookie-метка входа, видимая js/holes.js: без неё посетитель анонимный,
+# и личные части страницы не запрашиваются.
+LOGGED_IN_COOKIE_NAME = 'logged_in'
+
+# Общий для рабочих процессов кеш; локально — в файлах.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_DIR',
+            str(Path(tempfile.gettempdir()) / 'blogicum_cache')
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Двухуровневый кеш лент (blog.cache): размер и время жизни уровня в
+# памяти процесса, сколько секунд после истечения запись ещё отдаётся,
+# пока обновляется в фоне, и параметр beta раннего пересчёта (XFetch).
+TIERED_CACHE_LOCAL_SIZE = 512
+
+TIERED_CACHE_LOCAL_TTL = 5
+
+TIERED_CACHE_STALE_TTL = 5 * 60
+
+TIERED_CACHE_BETA = 1.0
+
+FEED_CACHE_TIMEOUT = 60
+# Страницы лент в кеше длиннее стольких байт сжимаются zlib.
+CACHE_COMPRESS_THRESHOLD = 1024
+
+# Деградация при сбоях базы (blog.degraded): бюджет времени запросов
+# одной страницы, после скольких ошибок подряд и на сколько секунд
+# страницы перестают обращаться к базе, сколько хранится последняя
+# удачная отрисовка и как часто она перезаписывается.
+DB_TIME_BUDGET = 2
+
+CIRCUIT_BREAKER_THRESHOLD = 5
+
+CIRCUIT_BREAKER_COOLDOWN = 30
+
+STALE_PAGE_TIMEOUT = 24 * 60 * 60
+
+STALE_PAGE_REFRESH = 30
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+MEDIA_URL = '/media/'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# python, x-accel-redirect (nginx) или x-sendfile (apache, lighttpd)
+MEDIA_SERVE_MODE = os.getenv('MEDIA_SERVE_MODE', 'python')
+
+MEDIA_INTERNAL_URL = '/protected-media/'
+
+MEDIA_SERVE_BUFFER_SIZE = 64 * 1024
+
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+POST_IMAGE_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 25_000_000
+
+# Если местоположений больше, в форме публикации вместо списка
+# используется поиск с подсказками.
+POST_FORM_MAX_CHOICES = 500
+
+# Асинхронные ленты публикаций (blog.async_views) имеют смысл только под
+# ASGI-сервером; запросы ленты выполняются в пуле из N потоков.
+ASYNC_FEED_VIEWS = os.getenv('ASYNC_FEED_VIEWS', '') == '1'
+
+ASYNC_QUERY_WORKERS = 8
+
+# Поток новых комментариев (blog.live) обслуживается только под ASGI.
+LIVE_COMMENTS = os.getenv('LIVE_COMMENTS', '') == '1'
+
+# Кеш категорий и местоположений в памяти процесса (blog.lookups):
+# число записей и время жизни в секундах. Изменения, сделанные в других
+# рабочих процессах, видны не позже чем через LOOKUP_CACHE_TTL.
+LOOKUP_CACHE_SIZE = 1024
+
+LOOKUP_CACHE_TTL = 5 * 60
+
+# Сколько несуществующих адресов профилей, категорий и публикаций
+# запоминается, чтобы повторный промах не шёл в базу, и на сколько
+# секунд: объекты, созданные в других рабочих процессах, отвечают 404
+# не дольше LOOKUP_MISSING_TTL.
+LOOKUP_MISSING_SIZE = 10000
+
+LOOKUP_MISSING_TTL = 30
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -57,7 +174,8 @@ CSRF_FAILURE_VIEW = 'pages.views.crsf_failure'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.template_backends.LazyDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -84,6 +202,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос в рабочих процессах manage.py
+        # serve, где запросы обслуживает один и тот же поток.
+        'CONN_MAX_AGE': 60,
     }
 }
 
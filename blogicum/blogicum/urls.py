@@ -1,10 +1,11 @@
 from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 
+from blog.media import serve_media
+
 
 urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
@@ -19,8 +20,13 @@ urlpatterns = [
     ),
     path('pages/', include('pages.urls', namespace='pages')),
     path('admin/', admin.site.urls),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        serve_media,
+        name='media'
+    ),
     path('', include('blog.urls', namespace='blog'))
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
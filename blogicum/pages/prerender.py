@@ -0,0 +1,79 @@
+import hashlib
+from functools import lru_cache
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.html import escape
+from django.utils.http import quote_etag
+
+HEADER_MARKER = '\x00header\x00'
+REQUEST_URI_MARKER = '\x00request-uri\x00'
+HEADER_TEMPLATE = 'includes/header.html'
+
+
+def make_etag(content):
+    return quote_etag(hashlib.sha256(content.encode()).hexdigest()[:32])
+
+
+def is_anonymous(request):
+    """Без cookie сессии посетитель точно анонимный; проверка не
+    обращается к базе.
+    """
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+class PrerenderedPage:
+    """Страница, отрисованная один раз в анонимном виде.
+
+    Шапка с состоянием входа вырезана из страницы: для анонимов
+    подставляется готовая, для вошедших отрисовывается только она.
+    Адрес запроса (страница 404) подставляется экранированным.
+    """
+
+    def __init__(self, template_name, view_name=None, status=200):
+        self.status = status
+        request = SimpleNamespace(
+            build_absolute_uri=lambda: REQUEST_URI_MARKER,
+            resolver_match=SimpleNamespace(view_name=view_name or '')
+        )
+        self.header = render_to_string(HEADER_TEMPLATE, {'request': request})
+        self.before_header, self.after_header = render_to_string(
+            template_name,
+            {'request': request, 'prerendered_header': HEADER_MARKER}
+        ).split(HEADER_MARKER)
+        self.content = self.before_header + self.header + self.after_header
+        self.etag = make_etag(self.content)
+
+    def render(self, request, personalize=True):
+        if not personalize or is_anonymous(request):
+            content, etag = self.content, self.etag
+        else:
+            content = self.before_header + render_to_string(
+                HEADER_TEMPLATE, request=request
+            ) + self.after_header
+            etag = make_etag(content)
+        if REQUEST_URI_MARKER in content:
+            content = content.replace(
+                REQUEST_URI_MARKER, escape(request.build_absolute_uri())
+            )
+            etag = make_etag(content)
+        return content, etag
+
+    def response(self, request, personalize=True):
+        content, etag = self.render(request, personalize)
+        response = None
+        if self.status == 200:
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, status=self.status)
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+
+@lru_cache(maxsize=None)
+def get_page(template_name, view_name=None, status=200):
+    return PrerenderedPage(template_name, view_name, status)
@@ -1,22 +1,64 @@
-from django.views.generic import TemplateView
+from django.http import HttpResponseServerError
 from django.shortcuts import render
+from django.views.generic import TemplateView
+
+from blog.lookups import KnownMissing
+
+from .prerender import get_page, is_anonymous
+
+PRERENDERED_PAGES = (
+    ('pages/about.html', 'pages:about'),
+    ('pages/rules.html', 'pages:rules'),
+    ('pages/404.html', None, 404),
+    ('pages/403csrf.html', None, 403),
+    ('pages/500.html', None, 500),
+)
+
+SERVER_ERROR_FALLBACK = (
+    '<!DOCTYPE html><html lang="ru"><meta charset="utf-8">'
+    '<title>Ошибка сервера</title><h1>Ошибка сервера</h1>'
+)
 
 
-class About(TemplateView):
+class PrerenderedTemplateView(TemplateView):
+
+    def get(self, request, *args, **kwargs):
+        return get_page(
+            self.template_name, request.resolver_match.view_name
+        ).response(request)
+
+
+class About(PrerenderedTemplateView):
     template_name = 'pages/about.html'
 
 
-class Rules(TemplateView):
+class Rules(PrerenderedTemplateView):
     template_name = 'pages/rules.html'
 
 
+def prerender_pages():
+    for page in PRERENDERED_PAGES:
+        get_page(*page)
+    return len(PRERENDERED_PAGES)
+
+
 def page_not_found(request, exception):
+    # Сканеры перебирают несуществующие адреса без сессии: повторный
+    # промах отдаётся готовой страницей без шаблонизатора.
+    if isinstance(exception, KnownMissing) and is_anonymous(request):
+        return get_page('pages/404.html', None, 404).response(request)
     return render(request, 'pages/404.html', status=404)
 
 
 def crsf_failure(request, reason=''):
-    return render(request, 'pages/403csrf.html', status=403)
+    return get_page('pages/403csrf.html', None, 403).response(request)
 
 
 def server_error(request):
-    return render(request, 'pages/500.html', status=500)
+    # Без шапки пользователя: сессия и база могут быть недоступны.
+    try:
+        return get_page('pages/500.html', None, 500).response(
+            request, personalize=False
+        )
+    except Exception:
+        return HttpResponseServerError(SERVER_ERROR_FALLBACK)
@@ -0,0 +1,25 @@
+document.querySelectorAll('select[data-autocomplete-url]').forEach((select) => {
+  const search = document.createElement('input');
+  search.type = 'search';
+  search.className = 'form-control mb-1';
+  search.placeholder = 'Начните вводить название';
+  select.before(search);
+  let timer;
+  search.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(async () => {
+      const url = new URL(select.dataset.autocompleteUrl, window.location);
+      url.searchParams.set('q', search.value);
+      const response = await fetch(url);
+      const {results} = await response.json();
+      const selected = select.selectedOptions[0];
+      select.replaceChildren(new Option('---------', ''));
+      if (selected && selected.value) {
+        select.add(new Option(selected.text, selected.value, true, true));
+      }
+      results
+        .filter(({id}) => String(id) !== select.value)
+        .forEach(({id, text}) => select.add(new Option(text, id)));
+    }, 250);
+  });
+});
@@ -0,0 +1,24 @@
+const commentForm = document.getElementById('comment-form');
+if (commentForm && window.fetch) {
+  commentForm.addEventListener('submit', async (event) => {
+    event.preventDefault();
+    const response = await fetch(commentForm.action, {
+      method: 'POST',
+      body: new FormData(commentForm),
+      headers: {'X-Requested-With': 'XMLHttpRequest'},
+    });
+    if (response.ok) {
+      const html = await response.text();
+      const comments = document.getElementById('comments');
+      const probe = document.createElement('div');
+      probe.innerHTML = html;
+      const anchor = probe.querySelector('a[name]');
+      if (!anchor || !document.getElementsByName(anchor.name).length) {
+        comments.insertAdjacentHTML('beforeend', html);
+      }
+      commentForm.reset();
+    } else {
+      commentForm.submit();
+    }
+  });
+}
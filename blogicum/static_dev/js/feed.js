@@ -0,0 +1,25 @@
+const feedMore = document.getElementById('feed-more');
+if (feedMore && window.IntersectionObserver && window.fetch) {
+  document.querySelectorAll('nav[aria-label="Page navigation"]')
+    .forEach((nav) => nav.remove());
+  let loading = false;
+  const observer = new IntersectionObserver(async (entries) => {
+    if (loading || !entries.some((entry) => entry.isIntersecting)) {
+      return;
+    }
+    loading = true;
+    const response = await fetch(feedMore.dataset.url);
+    const {html, next} = await response.json();
+    feedMore.insertAdjacentHTML('beforebegin', html);
+    if (next) {
+      const url = new URL(feedMore.dataset.url, window.location);
+      url.searchParams.set('cursor', next);
+      feedMore.dataset.url = url;
+      loading = false;
+    } else {
+      observer.disconnect();
+      feedMore.remove();
+    }
+  }, {rootMargin: '600px'});
+  observer.observe(feedMore);
+}
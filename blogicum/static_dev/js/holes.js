@@ -0,0 +1,25 @@
+const {url, cookie} = document.currentScript.dataset;
+const holes = document.querySelectorAll('[data-hole]');
+// Анонимному посетителю личные части не нужны: шапка уже анонимная.
+const loggedIn = document.cookie.split('; ').some(
+  (pair) => pair.startsWith(cookie + '=')
+);
+if (holes.length && loggedIn && window.fetch) {
+  fetch(url, {credentials: 'same-origin'})
+    .then((response) => response.json())
+    .then((fragments) => {
+      holes.forEach((hole) => {
+        const html = fragments[hole.dataset.hole];
+        if (html === undefined) {
+          return;
+        }
+        hole.innerHTML = html;
+        // Скрипты, вставленные через innerHTML, не выполняются.
+        hole.querySelectorAll('script[src]').forEach((script) => {
+          const copy = document.createElement('script');
+          copy.src = script.src;
+          script.replaceWith(copy);
+        });
+      });
+    });
+}
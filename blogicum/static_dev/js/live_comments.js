@@ -0,0 +1,9 @@
+const comments = document.getElementById('comments');
+if (comments && window.EventSource) {
+  const source = new EventSource(comments.dataset.streamUrl);
+  source.addEventListener('comment', (event) => {
+    if (!document.getElementsByName(`comment_${event.lastEventId}`).length) {
+      comments.insertAdjacentHTML('beforeend', event.data);
+    }
+  });
+}
@@ -41,6 +41,35 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    from blog.cache import tiered_cache
+    from blog.lookups import LOOKUP_CACHES, MISSING_KEYS
+
+    for cache in [
+        *caches.all(), *LOOKUP_CACHES.values(), *MISSING_KEYS.values(),
+        tiered_cache.local,
+    ]:
+        cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def run_cache_resets_at_once(request, monkeypatch):
+    # Тесты без transaction=True идут внутри транзакции, которая не
+    # фиксируется, и on_commit в них не срабатывает.
+    marker = request.node.get_closest_marker('django_db')
+    if 'transactional_db' in request.fixturenames or (
+        marker and marker.kwargs.get('transaction')
+    ):
+        return
+    monkeypatch.setattr(
+        'blog.signals.after_commit', lambda func, *args: func(*args)
+    )
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.paginators import EstimatedCountPaginator
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('url', ['/admin/blog/post/', '/admin/blog/comment/'])
+def test_changelist_queries_do_not_grow_with_rows(
+        admin_client, mixer, user, url):
+    mixer.cycle(3).blend('blog.Comment', author=user, post__author=user)
+    # Первый запрос кладёт сессию и пользователя в кеш.
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as few:
+        assert admin_client.get(url).status_code == 200
+    mixer.cycle(20).blend('blog.Comment', author=user, post__author=user)
+    with CaptureQueriesContext(connection) as many:
+        assert admin_client.get(url).status_code == 200
+    assert len(many) == len(few)
+    assert not any(
+        'COUNT(*) FROM "blog_' in query['sql'] and 'LIMIT' not in query['sql']
+        for query in many.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_estimated_count_paginator(mixer, user):
+    mixer.cycle(5).blend('blog.Comment', author=user, post__author=user)
+    paginator = EstimatedCountPaginator(Comment.objects.all(), 2)
+    assert paginator.count >= 5
+    filtered = EstimatedCountPaginator(Post.objects.filter(author=user), 2)
+    filtered.count_limit = 3
+    assert filtered.count == 3
@@ -0,0 +1,36 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+def test_anonymous_read_skips_session(client, user, published_category,
+                                      mixer):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    for url in ('/', f'/posts/{post.id}/', f'/profile/{user.username}/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not response.cookies
+        assert 'public' in response['Cache-Control']
+        assert 'Cookie' in response['Vary']
+        assert not any(
+            'django_session' in query['sql']
+            for query in queries.captured_queries
+        )
+        assert response['X-Frame-Options'] == 'DENY'
+
+
+@pytest.mark.django_db
+def test_logged_in_and_write_views_use_full_stack(user_client, client):
+    response = user_client.get('/')
+    assert 'public' not in response.get('Cache-Control', '')
+    assert client.get('/posts/create/').status_code == 302
+    assert 'public' not in client.get('/auth/login/').get(
+        'Cache-Control', ''
+    )
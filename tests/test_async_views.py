@@ -0,0 +1,75 @@
+import pytest
+from django.test import override_settings
+from django.urls import include, path
+from django.utils import timezone
+
+from blog import degraded
+from blog.async_views import (
+    AsyncCategoryDetailView,
+    AsyncPostListView,
+    AsyncProfileDetailView
+)
+
+urlpatterns = [
+    path('async/', AsyncPostListView.as_view()),
+    path('async/category/<slug:category_slug>/',
+         AsyncCategoryDetailView.as_view()),
+    path('async/profile/<str:username>/', AsyncProfileDetailView.as_view()),
+    path('', include('blogicum.urls')),
+]
+
+
+def page_ids(response):
+    assert response.status_code == 200
+    page = response.context['page_obj']
+    return page.paginator.count, [post.id for post in page]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(ROOT_URLCONF=__name__)
+def test_async_feeds_match_sync_feeds(user, user_client, client, mixer,
+                                      published_category):
+    mixer.cycle(15).blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False
+    )
+    for sync_url, async_url in (
+        ('/', '/async/'),
+        (f'/category/{published_category.slug}/',
+         f'/async/category/{published_category.slug}/'),
+        (f'/profile/{user.username}/', f'/async/profile/{user.username}/'),
+    ):
+        for page in ('1', '2', 'last'):
+            for test_client in (client, user_client):
+                assert page_ids(
+                    test_client.get(async_url, {'page': page})
+                ) == page_ids(test_client.get(sync_url, {'page': page}))
+    response = client.get(f'/async/category/{published_category.slug}/')
+    assert response.context['category'] == published_category
+    count, _ = page_ids(user_client.get(f'/async/profile/{user.username}/'))
+    assert count == 17
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(ROOT_URLCONF=__name__)
+def test_async_feeds_not_found(client, mixer):
+    category = mixer.blend('blog.Category', is_published=False)
+    assert client.get(f'/async/category/{category.slug}/').status_code == 404
+    assert client.get('/async/profile/nobody/').status_code == 404
+    assert client.get('/async/', {'page': 5}).status_code == 404
+    assert client.get('/async/', {'page': 'x'}).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(ROOT_URLCONF=__name__)
+def test_async_feed_serves_stale_copy(client, monkeypatch):
+    degraded.recently_stored.clear()
+    fresh = client.get('/async/')
+    monkeypatch.setattr(degraded.breaker, 'allow', lambda: False)
+    stale = client.get('/async/', {'x': 1})
+    assert stale.content == fresh.content
+    assert 'Stale' in stale['Warning']
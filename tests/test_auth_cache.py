@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def auth_queries(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if 'FROM "django_session"' in query['sql']
+        or query['sql'].startswith('SELECT "auth_user"')
+    ]
+
+
+@pytest.mark.django_db
+def test_session_and_user_come_from_cache(client, user):
+    user.set_password('password')
+    user.save()
+    client.login(username=user.username, password='password')
+    client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/')
+    assert response.context['user'] == user
+    assert auth_queries(queries) == []
+
+    client.post(f'/profile/{user.username}/edit/', {
+        'username': 'renamed', 'first_name': '', 'last_name': '',
+        'email': 'renamed@example.com',
+    })
+    response = client.get('/')
+    assert response.context['user'].username == 'renamed'
+
+
+@pytest.mark.django_db
+def test_password_change_logs_out_other_sessions(client, user):
+    user.set_password('password')
+    user.save()
+    other = client.__class__()
+    for session in (client, other):
+        session.login(username=user.username, password='password')
+        session.get('/')
+    user.set_password('changed')
+    user.save()
+    assert not other.get('/').context['user'].is_authenticated
+    client.logout()
+    assert not client.get('/').context['user'].is_authenticated
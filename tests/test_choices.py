@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.choices import AutocompleteSelect
+from blog.forms import PostForm
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_form_choices_are_cached(published_category, published_location,
+                                      mixer):
+    PostForm().as_p()
+    with CaptureQueriesContext(connection) as queries:
+        html = PostForm().as_p()
+        form = PostForm(data={
+            'title': 'Заголовок', 'text': 'Текст',
+            'pub_date': '2020-01-01T10:00',
+            'category': published_category.pk,
+            'location': published_location.pk,
+        })
+        assert form.is_valid(), form.errors
+    assert all(
+        query['sql'].startswith('SELECT (1) AS "a"')
+        for query in queries.captured_queries
+    )
+    assert str(published_category) in html
+    assert form.cleaned_data['category'] == published_category
+
+    category = mixer.blend('blog.Category', title='Новая категория')
+    assert category.title in PostForm().as_p()
+    category.delete()
+    assert category.title not in PostForm().as_p()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_location_autocomplete(user_client, mixer):
+    locations = [
+        mixer.blend('blog.Location', name=name, is_published=True)
+        for name in ('Москва', 'Московский', 'Казань')
+    ]
+    with override_settings(POST_FORM_MAX_CHOICES=2):
+        form = PostForm(instance=mixer.blend(
+            'blog.Post', location=locations[0]
+        ))
+        assert isinstance(form.fields['location'].widget, AutocompleteSelect)
+        html = str(form['location'])
+    assert locations[0].name in html
+    assert locations[1].name not in html
+
+    response = user_client.get(
+        '/locations/autocomplete/', {'q': 'Моск'}
+    )
+    assert [item['id'] for item in response.json()['results']] == [
+        locations[0].id, locations[1].id
+    ]
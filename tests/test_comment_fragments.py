@@ -0,0 +1,55 @@
+import pytest
+from django.utils import timezone
+
+XHR = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+JSON = {'HTTP_ACCEPT': 'application/json'}
+
+
+@pytest.fixture
+def post(mixer, user):
+    return mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        category__is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+
+
+@pytest.mark.django_db
+def test_create_comment_fragment(user_client, user, post):
+    url = f'/posts/{post.id}/comment/'
+    response = user_client.post(url, {'text': 'Фрагмент'}, **XHR)
+    assert response.status_code == 201
+    comment = post.comments.get()
+    html = response.content.decode()
+    assert f'name="comment_{comment.id}"' in html
+    assert f'/posts/{post.id}/edit_comment/{comment.id}/' in html
+    assert '<html' not in html
+
+    response = user_client.post(url, {'text': 'JSON'}, **JSON)
+    assert response.status_code == 201
+    assert response.json()['id'] == post.comments.latest('id').id
+
+    response = user_client.post(url, {'text': ''}, **JSON)
+    assert response.status_code == 400
+    assert 'text' in response.json()['errors']
+
+    response = user_client.post(url, {'text': 'Без JavaScript'})
+    assert response.status_code == 302
+    assert response['Location'] == f'/posts/{post.id}/'
+
+
+@pytest.mark.django_db
+def test_edit_and_delete_comment_fragment(user_client, user, post, mixer):
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    base = f'/posts/{post.id}/'
+    response = user_client.post(
+        f'{base}edit_comment/{comment.id}/', {'text': 'Исправлено'}, **XHR
+    )
+    assert response.status_code == 200
+    assert 'Исправлено' in response.content.decode()
+
+    response = user_client.post(
+        f'{base}delete_comment/{comment.id}/', **JSON
+    )
+    assert response.json() == {'id': comment.id}
+    assert not post.comments.exists()
@@ -0,0 +1,90 @@
+import pytest
+from django.db import DatabaseError, OperationalError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import degraded
+
+
+@pytest.fixture(autouse=True)
+def reset_breaker():
+    degraded.breaker.success()
+    degraded.recently_stored.clear()
+    yield
+    degraded.breaker.success()
+
+
+@pytest.fixture
+def post_url(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    return f'/posts/{post.id}/'
+
+
+def database_is_locked(execute, sql, params, many, context):
+    raise OperationalError('database is locked')
+
+
+@pytest.mark.django_db
+def test_stale_page_is_served_on_database_error(client, post_url):
+    fresh = client.get(post_url)
+    with connection.execute_wrapper(database_is_locked):
+        stale = client.get(post_url)
+    assert stale.status_code == 200
+    assert stale.content == fresh.content
+    assert 'Stale' in stale['Warning']
+    assert 'public' not in stale['Cache-Control']
+    assert int(stale['Age']) >= 0
+
+
+@pytest.mark.django_db
+def test_slow_database_exceeds_budget(client, post_url):
+    client.get(post_url)
+    with override_settings(DB_TIME_BUDGET=-1):
+        response = client.get(post_url)
+    assert 'Warning' in response
+
+
+@pytest.mark.django_db
+def test_open_circuit_stops_queries(client, post_url, monkeypatch):
+    monkeypatch.setattr(degraded.breaker, 'threshold', 2)
+    with connection.execute_wrapper(database_is_locked):
+        for _ in range(2):
+            assert client.get(post_url).status_code == 503
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(post_url)
+    assert response.status_code == 503
+    assert response['Retry-After']
+    assert not queries.captured_queries
+
+    monkeypatch.setattr(degraded.breaker, 'cooldown', 0)
+    assert client.get(post_url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_budget_interrupts_running_query():
+    endless = (
+        'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c '
+        'WHERE x < 1000000000) SELECT count(*) FROM c'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout, = cursor.fetchone()
+        with pytest.raises(DatabaseError):
+            with degraded.QueryBudget(0.05):
+                cursor.execute(endless)
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone() == (busy_timeout,)
+        cursor.execute('SELECT 1')
+
+
+def test_stale_key_ignores_unrelated_parameters(rf):
+    key = degraded.get_stale_key
+    assert key(rf.get('/posts/1/?x=1')) == key(rf.get('/posts/1/?page=2'))
+    assert key(rf.get('/?x=1'), True) == key(rf.get('/?page=1&x=2'), True)
+    assert key(rf.get('/?page=02'), True) == key(rf.get('/?page=2'), True)
+    assert key(rf.get('/?page=2'), True) != key(rf.get('/'), True)
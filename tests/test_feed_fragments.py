@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@pytest.fixture
+def feed(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(25).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timezone.timedelta(hours=i) for i in range(25))
+    )
+
+
+def read_feed(client, url):
+    ids = []
+    cursor = ''
+    while True:
+        data = client.get(url, {'cursor': cursor}).json()
+        ids += [
+            int(part.split('/')[0])
+            for part in data['html'].split('href="/posts/')[1::2]
+        ]
+        if data['next'] is None:
+            return ids
+        cursor = data['next']
+
+
+@pytest.mark.django_db
+def test_fragments_walk_whole_feed(client, user, published_category, feed,
+                                   mixer):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False
+    )
+    expected = [post.id for post in feed]
+    assert read_feed(client, '/more/') == expected
+    assert read_feed(
+        client, f'/category/{published_category.slug}/more/'
+    ) == expected
+    assert read_feed(client, f'/profile/{user.username}/more/') == expected
+
+    data = client.get('/more/').json()
+    assert '<html' not in data['html']
+    assert data['html'].count('<article') == 10
+
+
+@pytest.mark.django_db
+def test_fragment_errors_and_page_link(client, feed):
+    assert client.get('/more/', {'cursor': 'x'}).status_code == 400
+    assert client.get('/category/missing/more/').status_code == 404
+    assert f'/more/?cursor={feed[9].id}' in client.get('/').content.decode()
+
+
+@pytest.mark.django_db
+def test_page_and_fragments_agree_on_equal_dates(client, mixer, user,
+                                                 published_category):
+    pub_date = timezone.now() - timezone.timedelta(days=1)
+    posts = mixer.cycle(15).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=pub_date
+    )
+    first_page = [post.id for post in client.get('/').context['page_obj']]
+    more = read_feed(client, '/more/')
+    assert more[:10] == first_page
+    assert more == sorted(post.id for post in posts)[::-1]
+
+
+@pytest.mark.django_db
+def test_fragments_are_cached_until_feed_changes(client, feed, mixer, user,
+                                                 published_category):
+    cursor = feed[9].id
+    first = client.get('/more/', {'cursor': cursor}).json()
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get('/more/', {'cursor': cursor}).json() == first
+    assert not any(
+        'COUNT(' in query['sql'] or 'LIMIT 11' in query['sql']
+        for query in queries.captured_queries
+    )
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Свежая',
+        pub_date=feed[15].pub_date + timezone.timedelta(minutes=1)
+    )
+    assert 'Свежая' in client.get('/more/', {'cursor': cursor}).json()['html']
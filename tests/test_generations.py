@@ -0,0 +1,89 @@
+import pytest
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache import bump_generations, get_generations, versioned_key
+from blog.models import Comment
+from blog.purge import purge_user
+
+
+def test_bump_changes_only_dependent_keys():
+    index = versioned_key('index', ['all', 'feed'])
+    category = versioned_key('category', ['all', 'category:news'])
+    bump_generations('category:news')
+    assert versioned_key('index', ['all', 'feed']) == index
+    assert versioned_key('category', ['all', 'category:news']) != category
+    bump_generations('all')
+    assert versioned_key('index', ['all', 'feed']) != index
+
+
+def test_lost_generation_does_not_restart_from_zero():
+    generation, = get_generations(['feed'])
+    assert generation > 10 ** 15
+
+
+@pytest.mark.django_db
+def test_post_save_bumps_its_namespaces(user, mixer, published_category):
+    other = mixer.blend('blog.Category', slug='other', is_published=True)
+    namespaces = [
+        'all', 'feed', f'author:{user.pk}',
+        f'category:{published_category.slug}', 'category:other',
+    ]
+    before = dict(zip(namespaces, get_generations(namespaces)))
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=None, pub_date=timezone.now()
+    )
+    after = dict(zip(namespaces, get_generations(namespaces)))
+    assert [ns for ns in namespaces if before[ns] != after[ns]] == [
+        'feed', f'author:{user.pk}', f'category:{published_category.slug}'
+    ]
+
+    post.category = other
+    post.save()
+    moved = dict(zip(namespaces, get_generations(namespaces)))
+    assert moved[f'category:{published_category.slug}'] != after[
+        f'category:{published_category.slug}'
+    ]
+    assert moved['category:other'] != after['category:other']
+
+    mixer.blend('blog.Comment', post=post, author=user)
+    commented = dict(zip(namespaces, get_generations(namespaces)))
+    assert commented['category:other'] != moved['category:other']
+    assert commented['all'] == before['all']
+
+
+@pytest.mark.django_db
+def test_comment_deletions_bump_post_namespaces(
+        admin_client, user, another_user, mixer, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=None, pub_date=timezone.now()
+    )
+    comments = mixer.cycle(2).blend(
+        'blog.Comment', post=post, author=another_user
+    )
+    namespaces = ['feed', f'category:{published_category.slug}']
+    before = get_generations(namespaces)
+    assert admin_client.post(
+        f'/admin/blog/comment/{comments[0].pk}/delete/', {'post': 'yes'}
+    ).status_code == 302
+    deleted = get_generations(namespaces)
+    assert all(b != d for b, d in zip(before, deleted))
+
+    purge_user(another_user, batch_size=1)
+    assert not Comment.objects.exists()
+    assert all(d != p for d, p in zip(deleted, get_generations(namespaces)))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generations_change_after_commit(user, mixer, published_category):
+    namespaces = ['feed', f'author:{user.pk}']
+    before = get_generations(namespaces)
+    with transaction.atomic():
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            location=None, pub_date=timezone.now()
+        )
+        assert get_generations(namespaces) == before
+    assert all(b != a for b, a in zip(before, get_generations(namespaces)))
@@ -0,0 +1,77 @@
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    mixer.blend('blog.Comment', post=post, author=user, is_published=True)
+    return post
+
+
+@pytest.mark.django_db
+@override_settings(PERSONALIZATION_HOLES=True)
+def test_shared_page_is_same_for_everyone(client, user_client, user, post):
+    url = f'/posts/{post.id}/'
+    shared = user_client.get(url)
+    assert shared.content == client.get(url).content
+    assert 'public' in shared['Cache-Control']
+    assert 'Cookie' not in shared.get('Vary', '')
+    html = shared.content.decode()
+    assert user.username + '</a></button>' not in html
+    assert f'/posts/{post.id}/edit/' not in html
+    assert 'data-hole="comment_form"' in html
+
+    holes = user_client.get('/holes/', {'post': post.id})
+    assert 'private' in holes['Cache-Control']
+    holes = holes.json()
+    assert user.username in holes['header']
+    assert f'/posts/{post.id}/edit/' in holes['post_controls']
+    assert 'csrfmiddlewaretoken' in holes['comment_form']
+    comment = post.comments.get()
+    assert f'comment_controls:{comment.id}' in holes
+    assert set(client.get('/holes/', {'post': post.id}).json()) == {'header'}
+
+
+@pytest.mark.django_db
+@override_settings(PERSONALIZATION_HOLES=True)
+def test_unpublished_post_page_is_not_shared(user_client, post):
+    post.is_published = False
+    post.save()
+    response = user_client.get(f'/posts/{post.id}/')
+    assert 'public' not in response.get('Cache-Control', '')
+    assert f'/posts/{post.id}/edit/' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_holes_are_off_by_default(user_client, post):
+    response = user_client.get(f'/posts/{post.id}/')
+    assert 'data-hole' not in response.content.decode()
+    assert f'/posts/{post.id}/edit/' in response.content.decode()
+
+
+@pytest.mark.django_db
+@override_settings(PERSONALIZATION_HOLES=True)
+def test_holes_are_fetched_only_after_login(client, django_user_model, post):
+    django_user_model.objects.create_user('reader', password='secret')
+    html = client.get(f'/posts/{post.id}/').content.decode()
+    assert 'data-cookie="logged_in"' in html
+    response = client.post(
+        '/auth/login/', {'username': 'reader', 'password': 'secret'}
+    )
+    marker = response.cookies['logged_in']
+    assert marker.value and not marker['httponly']
+    assert 'logged_in' not in client.get(f'/posts/{post.id}/').cookies
+    response = client.get('/auth/logout/')
+    assert response.cookies['logged_in']['max-age'] == 0
+
+    client.cookies.pop(settings.SESSION_COOKIE_NAME, None)
+    client.cookies['logged_in'] = '1'
+    response = client.get('/auth/login/')
+    assert response.cookies['logged_in']['max-age'] == 0
@@ -0,0 +1,59 @@
+from io import BytesIO, StringIO
+
+import pytest
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.models import ImageBlob, Post
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height)).save(buffer, format='PNG')
+    return ContentFile(buffer.getvalue())
+
+
+@pytest.fixture
+def post_with_image(tmp_path, mixer, user):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        post = mixer.blend('blog.Post', author=user, image='')
+        post.image.save('image.png', make_image(30, 20))
+        yield post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dimensions_stored_on_upload(post_with_image):
+    blob = ImageBlob.objects.get(name=post_with_image.image.name)
+    assert (blob.width, blob.height) == (30, 20)
+    post = Post.objects.get(pk=post_with_image.pk)
+    assert post.image_size == (30, 20)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_image_dimensions(post_with_image):
+    ImageBlob.objects.update(width=None, height=None)
+    with override_settings(MEDIA_ROOT=post_with_image.image.storage.location):
+        call_command(
+            'backfill_image_dimensions', workers=1, stdout=StringIO()
+        )
+    post = Post.objects.get(pk=post_with_image.pk)
+    assert post.image_size == (30, 20)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_markup(post_with_image, client, mixer):
+    mixer.blend(
+        'blog.Post', author=post_with_image.author,
+        category=post_with_image.category, image='',
+        pub_date=post_with_image.pub_date
+    )
+    with override_settings(MEDIA_ROOT=post_with_image.image.storage.location):
+        detail = client.get(f'/posts/{post_with_image.pk}/').content.decode()
+        category = client.get(
+            f'/category/{post_with_image.category.slug}/'
+        ).content.decode()
+    assert 'width="30" height="20"' in detail
+    assert 'loading="lazy"' not in detail
+    assert 'decoding="async"' in category
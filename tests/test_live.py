@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.live import comment_stream, hub
+
+
+@pytest.fixture
+def visible_post(mixer, user):
+    return mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        category__is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+
+
+def stream_scope(post, after=None):
+    return {
+        'type': 'http', 'method': 'GET',
+        'path': f'/posts/{post.id}/comments/stream/',
+        'query_string': f'after={after}'.encode() if after else b'',
+        'headers': [],
+    }
+
+
+async def read_stream(scope, post_id, action, watchers=1):
+    """Подключиться к потоку и, когда подписчиков станет watchers,
+    выполнить action; отключиться после первого события.
+    """
+    sent = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+        body = b''.join(item.get('body', b'') for item in sent)
+        if b'event: comment' in body:
+            disconnected.set()
+
+    task = asyncio.ensure_future(comment_stream(scope, receive, send, post_id))
+    while len(hub.subscribers.get(post_id, {})) < watchers and not task.done():
+        await asyncio.sleep(0.01)
+    await sync_to_async(action)()
+    await asyncio.wait_for(task, 5)
+    return sent[0], b''.join(item.get('body', b'') for item in sent[1:])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_new_comment_is_pushed_once_to_every_watcher(visible_post, mixer,
+                                                     user):
+    def create_comment():
+        mixer.blend(
+            'blog.Comment', post=visible_post, author=user,
+            text='Живой комментарий', is_published=True
+        )
+
+    async def watch_together():
+        return await asyncio.gather(
+            read_stream(stream_scope(visible_post), visible_post.id,
+                        lambda: None, watchers=2),
+            read_stream(stream_scope(visible_post), visible_post.id,
+                        create_comment, watchers=2),
+        )
+
+    results = async_to_sync(watch_together)()
+    assert not hub.has_subscribers(visible_post.id)
+    for start, body in results:
+        assert start['status'] == 200
+        assert (b'content-type', b'text/event-stream') in start['headers']
+        assert body.count(b'event: comment') == 1
+        assert 'Живой комментарий'.encode() in body
+        assert f'@{user.username}'.encode() in body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_resends_missed_comments(visible_post, mixer):
+    missed = mixer.blend(
+        'blog.Comment', post=visible_post, is_published=True
+    )
+    seen = mixer.blend('blog.Comment', post=visible_post, is_published=True)
+    missed.delete()
+    missed = mixer.blend(
+        'blog.Comment', post=visible_post, is_published=True
+    )
+    start, body = async_to_sync(read_stream)(
+        stream_scope(visible_post, after=seen.id), visible_post.id,
+        lambda: None
+    )
+    assert f'id: {missed.id}\n'.encode() in body
+    assert f'id: {seen.id}\n'.encode() not in body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_of_hidden_post_is_not_found(mixer):
+    post = mixer.blend('blog.Post', is_published=False)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async_to_sync(comment_stream)(stream_scope(post), None, send, post.id)
+    assert sent[0]['status'] == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_detail_page_links_stream(visible_post, client):
+    with override_settings(LIVE_COMMENTS=True):
+        response = client.get(f'/posts/{visible_post.id}/')
+    assert (
+        f'data-stream-url="/posts/{visible_post.id}/comments/stream/?after=0"'
+    ) in response.content.decode()
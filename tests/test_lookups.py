@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.lookups import MISSING_KEYS, LRUCache, categories, lookup_stats
+from blog.models import Category
+
+
+def test_lru_cache_evicts_least_recent():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    cache.get('a', lambda: None)
+    cache.get('c', lambda: 3)
+    assert cache.get('a', lambda: None) == 1
+    assert cache.get('b', lambda: 'reloaded') == 'reloaded'
+    assert cache.stats()['size'] == 2
+
+
+def test_lru_cache_expires_and_skips_missing():
+    cache = LRUCache(maxsize=2, ttl=0)
+    cache.get('a', lambda: 1)
+    assert cache.get('a', lambda: 2) == 2
+    cache = LRUCache(maxsize=2, ttl=60)
+    assert cache.get('a', lambda: None) is None
+    assert cache.get('a', lambda: 1) == 1
+    assert cache.stats() == {'hits': 0, 'misses': 2, 'size': 1, 'maxsize': 2}
+
+
+@pytest.mark.django_db
+def test_category_page_uses_cache(client, user, published_category,
+                                  published_location, mixer):
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timezone.timedelta(days=1)
+    )
+    url = f'/category/{published_category.slug}/'
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert published_location.name in response.content.decode()
+    assert not any(
+        'FROM "blog_location"' in query['sql']
+        or query['sql'].startswith('SELECT "blog_category"')
+        for query in queries.captured_queries
+    )
+
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404
+    assert categories.stats()['hits'] > 0
+
+
+@pytest.mark.django_db
+def test_cache_stats_are_staff_only(client, admin_client):
+    assert client.get('/cache/stats/').status_code in (302, 403)
+    data = admin_client.get('/cache/stats/').json()
+    assert set(data) == {'pid', *lookup_stats()}
+
+
+@pytest.mark.django_db
+def test_known_missing_pages_skip_queries(client, user, mixer):
+    urls = ['/profile/nobody/', '/category/nothing/', '/posts/999999/']
+    for url in urls:
+        assert client.get(url).status_code == 404
+    for url in urls:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url + '?a=1&b=2')
+        assert response.status_code == 404
+        assert queries.captured_queries == []
+        assert 'http://testserver' + url + '?a=1&amp;b=2' in (
+            response.content.decode()
+        )
+        assert 'Страница не найдена' in response.content.decode()
+
+    mixer.blend('blog.Category', slug='nothing', is_published=True)
+    assert client.get('/category/nothing/').status_code == 200
+    user.username = 'nobody'
+    user.save()
+    assert client.get('/profile/nobody/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_known_missing_keys_expire(client):
+    assert client.get('/category/later/').status_code == 404
+    # Как будто категорию создал другой процесс: сигнал здесь не придёт.
+    Category.objects.bulk_create([
+        Category(title='Позже', slug='later', description='Описание')
+    ])
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get('/category/later/').status_code == 404
+    assert queries.captured_queries == []
+    keys = MISSING_KEYS[Category].keys
+    keys.update(dict.fromkeys(keys, time.monotonic()))
+    assert client.get('/category/later/').status_code == 200
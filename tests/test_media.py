@@ -0,0 +1,81 @@
+import pytest
+from django.test import override_settings
+
+IMAGE_CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    (tmp_path / 'posts_images').mkdir()
+    (tmp_path / 'posts_images' / 'image.jpg').write_bytes(IMAGE_CONTENT)
+    with override_settings(MEDIA_ROOT=tmp_path, MEDIA_SERVE_MODE='python'):
+        yield tmp_path
+
+
+def test_media_full_response(client, media_root):
+    response = client.get('/media/posts_images/image.jpg')
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == IMAGE_CONTENT
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Accept-Ranges'] == 'bytes'
+    assert response['ETag']
+
+
+@pytest.mark.parametrize(
+    ('range_header', 'expected_range', 'start', 'end'),
+    [
+        ('bytes=0-99', 'bytes 0-99/1024', 0, 100),
+        ('bytes=1000-', 'bytes 1000-1023/1024', 1000, 1024),
+        ('bytes=-24', 'bytes 1000-1023/1024', 1000, 1024),
+        ('bytes=1000-5000', 'bytes 1000-1023/1024', 1000, 1024),
+    ]
+)
+def test_media_range(client, media_root, range_header, expected_range,
+                     start, end):
+    response = client.get(
+        '/media/posts_images/image.jpg', HTTP_RANGE=range_header
+    )
+    assert response.status_code == 206
+    assert response['Content-Range'] == expected_range
+    assert b''.join(response.streaming_content) == IMAGE_CONTENT[start:end]
+
+
+def test_media_unsatisfiable_range(client, media_root):
+    response = client.get(
+        '/media/posts_images/image.jpg', HTTP_RANGE='bytes=2000-'
+    )
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */1024'
+
+
+def test_media_if_range_mismatch_returns_full_file(client, media_root):
+    response = client.get(
+        '/media/posts_images/image.jpg',
+        HTTP_RANGE='bytes=0-9',
+        HTTP_IF_RANGE='"stale"',
+    )
+    assert response.status_code == 200
+
+
+def test_media_not_modified(client, media_root):
+    etag = client.get('/media/posts_images/image.jpg')['ETag']
+    response = client.get(
+        '/media/posts_images/image.jpg', HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+def test_media_x_accel_redirect(client, media_root):
+    with override_settings(MEDIA_SERVE_MODE='x-accel-redirect'):
+        response = client.get('/media/posts_images/image.jpg')
+    assert response.status_code == 200
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/posts_images/image.jpg'
+    )
+    assert not response.content
+
+
+def test_media_missing_and_traversal(client, media_root):
+    assert client.get('/media/posts_images/missing.jpg').status_code == 404
+    assert client.get('/media/../settings.py').status_code == 404
@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from pages import prerender, views
+
+
+@pytest.fixture(autouse=True)
+def clear_pages():
+    prerender.get_page.cache_clear()
+    yield
+    prerender.get_page.cache_clear()
+
+
+@pytest.mark.django_db
+def test_static_page_is_served_prerendered(client, user_client, user):
+    response = client.get('/pages/about/')
+    assert 'Войти' in response.content.decode()
+    with CaptureQueriesContext(connection) as queries:
+        again = client.get('/pages/about/')
+    assert not queries.captured_queries
+    assert not again.templates
+    assert again.content == response.content
+    assert again['ETag'] == response['ETag']
+    assert client.get(
+        '/pages/about/', HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == 304
+
+    personal = user_client.get('/pages/about/')
+    assert user.username in personal.content.decode()
+    assert personal['ETag'] != response['ETag']
+    assert 'О проекте' in personal.content.decode()
+
+
+def test_server_error_without_templates(monkeypatch):
+    request = RequestFactory().get('/')
+    views.prerender_pages()
+
+    def broken(*args, **kwargs):
+        raise RuntimeError
+
+    monkeypatch.setattr(prerender, 'render_to_string', broken)
+    response = views.server_error(request)
+    assert response.status_code == 500
+    assert 'На сервере что-то пошло не так' in response.content.decode()
+
+    prerender.get_page.cache_clear()
+    response = views.server_error(request)
+    assert response.status_code == 500
+    assert 'Ошибка сервера' in response.content.decode()
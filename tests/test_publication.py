@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.signals import publication_changed
+
+
+@pytest.fixture
+def published_changes():
+    received = []
+
+    def receiver(sender, pks, is_published, **kwargs):
+        received.append((sender, sorted(pks), is_published))
+
+    publication_changed.connect(receiver)
+    yield received
+    publication_changed.disconnect(receiver)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unpublish_action_runs_single_update(
+        admin_client, mixer, user, published_changes):
+    posts = mixer.cycle(5).blend('blog.Post', author=user, is_published=True)
+    pks = sorted(post.pk for post in posts[:4])
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.post('/admin/blog/post/', {
+            'action': 'unpublish',
+            '_selected_action': pks,
+        })
+    assert response.status_code == 302
+    updates = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1
+    assert sorted(
+        Post.objects.filter(is_published=False).values_list('pk', flat=True)
+    ) == pks
+    assert published_changes == [(Post, pks, False)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unpublished_comment_is_hidden(
+        admin_client, client, comment_to_a_post, published_changes):
+    post = comment_to_a_post.post
+    admin_client.post('/admin/blog/comment/', {
+        'action': 'unpublish',
+        '_selected_action': [comment_to_a_post.pk],
+    })
+    assert not Comment.objects.get(pk=comment_to_a_post.pk).is_published
+    assert published_changes == [(Comment, [comment_to_a_post.pk], False)]
+    response = client.get(f'/posts/{post.pk}/')
+    assert comment_to_a_post.text not in response.content.decode()
@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.models import Comment, DeletedUser, ImageBlob, Post, User
+from blog.purge import soft_delete_user
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_view_hides_post_and_purge_removes_it(
+        user_client, post_with_published_location, mixer, tmp_path):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post, author=post.author)
+    with override_settings(MEDIA_ROOT=tmp_path):
+        post.image.save('image.jpg', ContentFile(b'image'))
+        image = post.image.name
+
+        response = user_client.post(f'/posts/{post.id}/delete/')
+        assert response.status_code == 302
+        assert not Post.objects.filter(pk=post.pk).exists()
+        assert Comment.objects.filter(post=post).count() == 5
+        assert user_client.get(f'/posts/{post.id}/').status_code == 404
+
+        output = StringIO()
+        call_command('purge_deleted', batch_size=2, stdout=output)
+        assert 'Комментарии: 4 из 5' in output.getvalue()
+        assert not Post.all_objects.filter(pk=post.pk).exists()
+        assert not Comment.objects.filter(post=post).exists()
+        assert not ImageBlob.objects.filter(name=image).exists()
+        assert not post.image.storage.exists(image)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_soft_deleted_user_is_purged(mixer, user, another_user,
+                                     post_with_published_location):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    own_post = mixer.blend('blog.Post', author=another_user)
+    soft_delete_user(another_user)
+    assert not Post.objects.filter(pk=own_post.pk).exists()
+    assert DeletedUser.objects.filter(user=another_user).exists()
+
+    call_command('purge_deleted', stdout=StringIO())
+    assert not User.objects.filter(pk=another_user.pk).exists()
+    assert not Comment.objects.exists()
+    assert Post.objects.filter(pk=post.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_soft_deleted_user_is_hidden_at_once(client, another_user, mixer,
+                                             post_with_published_location):
+    post = post_with_published_location
+    mixer.blend(
+        'blog.Comment', post=post, author=another_user, is_published=True,
+        text='Спам от удаляемого'
+    )
+    url = f'/posts/{post.id}/'
+    assert 'Спам от удаляемого' in client.get(url).content.decode()
+    assert client.get(f'/profile/{another_user.username}/').status_code == 200
+    feed = client.get('/').content.decode()
+    assert 'Комментарии (1)' in feed
+
+    soft_delete_user(another_user)
+    assert 'Спам от удаляемого' not in client.get(url).content.decode()
+    assert client.get(f'/profile/{another_user.username}/').status_code == 404
+    assert 'Комментарии (0)' in client.get('/').content.decode()
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+import pytest
+from django.template.loader import render_to_string
+from django.test import override_settings
+
+from blog.serializers import COMPRESSED, RAW, pack_posts, unpack_posts
+from blog.utils import posts_filter
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('threshold, flag', [(10 ** 6, RAW), (0, COMPRESSED)])
+def test_posts_round_trip(post_with_published_location, threshold, flag):
+    post = post_with_published_location
+    post.text = 'слово ' * 100
+    post.save()
+    with override_settings(CACHE_COMPRESS_THRESHOLD=threshold):
+        data = pack_posts(posts_filter(filter_posts=False))
+        record, = unpack_posts(data)
+    assert data[:1] == flag
+    assert record.pk == post.pk
+    assert record.author.username == post.author.username
+    assert record.category == post.category
+    assert record.location == post.location
+    assert record.comment_count == 0
+    assert record.image.url == post.image.url
+    assert record.text == 'слово ' * 9 + 'слово …'
+
+
+@pytest.mark.django_db
+def test_records_render_like_model_instances(
+        client, post_with_published_location, mixer):
+    post = post_with_published_location
+    post.text = 'Первая строка\nвторая <b>строка</b> ' + 'слово ' * 20
+    post.save()
+    mixer.cycle(2).blend('blog.Comment', post=post, is_published=True)
+    mixer.blend(
+        'blog.Post', category=post.category, location=None, image=None,
+        is_published=True, pub_date=post.pub_date - timedelta(days=1)
+    )
+    posts = list(posts_filter())
+    assert len(posts) == 2
+
+    def render(objects):
+        return render_to_string('includes/post_cards.html', {'posts': objects})
+
+    assert render(unpack_posts(pack_posts(posts))) == render(posts)
+
+    response = client.get('/')
+    assert type(response.context['page_obj'][0]).__name__ == 'PostRecord'
+    assert render(posts) in response.content.decode()
@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template import TemplateSyntaxError
+
+from blog.management.commands.profile_startup import parse_importtime
+from blog.models import Post
+from blog.template_backends import LazyDjangoTemplates
+
+
+def test_parse_importtime():
+    roots = parse_importtime([
+        'import time: self [us] | cumulative | imported package',
+        'import time:        10 |         10 |     c',
+        'import time:        20 |         30 |   b',
+        'import time:         5 |          5 |   d',
+        'import time:       100 |        135 | a',
+        'import time:         7 |          7 | e',
+    ])
+    assert [node.name for node in roots] == ['a', 'e']
+    a = roots[0]
+    assert a.cumulative == 135
+    assert [node.name for node in a.children] == ['b', 'd']
+    assert a.children[0].children[0].name == 'c'
+
+
+def test_profile_startup():
+    out = StringIO()
+    call_command(
+        'profile_startup', url='/pages/about/', min_time=0, stdout=out
+    )
+    output = out.getvalue()
+    assert 'django.setup()' in output
+    assert 'первый запрос /pages/about/' in output
+
+
+def test_template_libraries_are_loaded_lazily():
+    backend = LazyDjangoTemplates({
+        'NAME': 'lazy', 'DIRS': [], 'APP_DIRS': False, 'OPTIONS': {},
+    })
+    libraries = backend.engine.template_libraries
+    assert libraries.get('django_bootstrap5') is not None
+    assert isinstance(dict.get(libraries, 'static'), str)
+    template = backend.from_string('{% load static %}{% static "a.css" %}')
+    assert template.render() == '/static/a.css'
+    assert not isinstance(dict.get(libraries, 'static'), str)
+
+
+def test_modules_without_register_are_not_libraries():
+    backend = LazyDjangoTemplates({
+        'NAME': 'lazy', 'DIRS': [], 'APP_DIRS': False,
+        'OPTIONS': {'libraries': {'helper': 'os.path'}},
+    })
+    with pytest.raises(TemplateSyntaxError, match='not a registered'):
+        backend.from_string('{% load helper %}')
+    assert 'helper' not in backend.engine.template_libraries
+
+
+def test_image_field_check_does_not_need_pillow_import():
+    assert Post._meta.get_field('image').check() == []
@@ -0,0 +1,50 @@
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.models import ImageBlob, Post
+from blog.storage import ContentAddressedStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield ContentAddressedStorage()
+
+
+def test_identical_uploads_are_stored_once(storage, tmp_path):
+    first = storage.save('posts_images/cat.JPG', ContentFile(b'meow'))
+    second = storage.save('posts_images/other.jpg', ContentFile(b'meow'))
+    third = storage.save('posts_images/cat.jpg', ContentFile(b'woof'))
+    assert first == second
+    assert first != third
+    assert first.startswith('posts_images/') and first.endswith('.jpg')
+    files = [path for path in tmp_path.rglob('*') if path.is_file()]
+    assert len(files) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_references_and_gc(storage, mixer, user):
+    post = mixer.blend('blog.Post', author=user, image='')
+    other = mixer.blend('blog.Post', author=user, image='')
+    for item in (post, other):
+        item.image.save('meme.jpg', ContentFile(b'meme'))
+    name = post.image.name
+    assert other.image.name == name
+    assert ImageBlob.objects.get(name=name).ref_count == 2
+
+    other.delete()
+    assert ImageBlob.objects.get(name=name).ref_count == 1
+    post.image = ''
+    post.save()
+    assert ImageBlob.objects.get(name=name).ref_count == 0
+    assert Post.objects.filter(image=name).count() == 0
+
+    call_command('gc_images', grace=3600, stdout=StringIO())
+    assert storage.exists(name)
+    call_command('gc_images', grace=-1, stdout=StringIO())
+    assert not storage.exists(name)
+    assert not ImageBlob.objects.filter(name=name).exists()
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import TieredCache
+
+
+@pytest.fixture
+def tiered():
+    cache = TieredCache(maxsize=16, local_ttl=60, stale_ttl=60, beta=1.0)
+    yield cache
+    cache.executor.shutdown(wait=True)
+
+
+def slow(result, calls, delay=0.2):
+    def compute():
+        calls.append(threading.current_thread().name)
+        time.sleep(delay)
+        return result
+    return compute
+
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_misses_compute_once(tiered):
+    calls = []
+    results = run_threads(
+        8, lambda: tiered.get_or_set('key', slow('value', calls), 60)
+    )
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_stale_value_is_served_while_refreshing(tiered):
+    tiered.compute('key', lambda: 'old', 0)
+    calls = []
+    released = threading.Event()
+    finished = threading.Event()
+
+    def compute():
+        calls.append(threading.current_thread().name)
+        # Пересчёт закончится только после ответа всем потокам.
+        released.wait(5)
+        finished.set()
+        return 'new'
+
+    results = run_threads(4, lambda: tiered.get_or_set('key', compute, 60))
+    assert not finished.is_set()
+    released.set()
+    assert results == ['old'] * 4
+    tiered.executor.shutdown(wait=True)
+    assert len(calls) == 1
+    assert calls[0].startswith('blog-cache')
+    assert tiered.backend.get('key')[0] == 'new'
+
+
+def test_early_recomputation(tiered, monkeypatch):
+    monkeypatch.setattr('random.random', lambda: 0.5)
+    now = time.time()
+    assert not tiered.recompute_early(now, now + 10, 1)
+    assert tiered.recompute_early(now, now + 10, 100)
+    tiered.backend.set('key', ('old', now + 10, 100), 60)
+    assert tiered.get_or_set('key', lambda: 'new', 60) == 'new'
+
+
+def test_backend_tier_survives_local_eviction(tiered):
+    calls = []
+    tiered.get_or_set('key', slow('value', calls, 0), 60)
+    tiered.clear_local()
+    assert tiered.get_or_set('key', slow('other', calls, 0), 60) == 'value'
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_feed_pages_are_cached_until_data_changes(client, user, mixer,
+                                                  published_category):
+    def create_post(title):
+        return mixer.blend(
+            'blog.Post', title=title, author=user, is_published=True,
+            category=published_category,
+            pub_date=timezone.now() - timezone.timedelta(days=1)
+        )
+
+    create_post('Первая')
+    assert 'Первая' in client.get('/').content.decode()
+    with CaptureQueriesContext(connection) as queries:
+        assert 'Первая' in client.get('/').content.decode()
+    assert not any(
+        'FROM "blog_post"' in query['sql']
+        for query in queries.captured_queries
+    )
+    create_post('Вторая')
+    assert 'Вторая' in client.get('/').content.decode()
@@ -0,0 +1,139 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.uploadhandlers import MetadataStripper
+
+
+def make_jpeg(width=16, height=16, exif=True):
+    buffer = BytesIO()
+    image = Image.new('RGB', (width, height), 'red')
+    exif_data = Image.Exif()
+    exif_data[0x010E] = 'secret description'
+    image.save(
+        buffer, format='JPEG', exif=exif_data.tobytes() if exif else b''
+    )
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_metadata_stripper_removes_exif(chunk_size):
+    data = make_jpeg()
+    assert b'secret description' in data
+    stripper = MetadataStripper()
+    stripped = b''.join(
+        stripper.feed(data[i:i + chunk_size])
+        for i in range(0, len(data), chunk_size)
+    ) + stripper.finish()
+    assert b'secret description' not in stripped
+    assert b'Exif' not in stripped
+    image = Image.open(BytesIO(stripped))
+    image.load()
+    assert image.size == (16, 16)
+
+
+def test_metadata_stripper_passes_unknown_formats():
+    stripper = MetadataStripper()
+    assert stripper.feed(b'GIF89a-data') + stripper.finish() == (
+        b'GIF89a-data'
+    )
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.id,
+        'location': published_location.id,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_strips_metadata(user_client, post_data, tmp_path):
+    post_data['image'] = SimpleUploadedFile(
+        'photo.jpg', make_jpeg(), content_type='image/jpeg'
+    )
+    with override_settings(MEDIA_ROOT=tmp_path):
+        response = user_client.post('/posts/create/', data=post_data)
+        assert response.status_code == 302
+        post = Post.objects.get()
+        assert b'secret description' not in post.image.read()
+        assert post.image_size == (16, 16)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    ('limits', 'message'),
+    [
+        ({'POST_IMAGE_MAX_UPLOAD_SIZE': 100}, 'Файл слишком большой'),
+        ({'POST_IMAGE_MAX_PIXELS': 100}, 'Изображение слишком большое'),
+    ]
+)
+def test_oversize_upload_is_rejected(user_client, post_data, tmp_path,
+                                     limits, message):
+    post_data['image'] = SimpleUploadedFile(
+        'photo.jpg', make_jpeg(64, 64), content_type='image/jpeg'
+    )
+    with override_settings(MEDIA_ROOT=tmp_path, **limits):
+        response = user_client.post('/posts/create/', data=post_data)
+    assert response.status_code == 200
+    assert message in response.context['form'].errors['image'][0]
+    assert not Post.objects.exists()
+
+
+@pytest.mark.parametrize('image_format', ['JPEG', 'PNG'])
+def test_metadata_stripper_keeps_orientation(image_format):
+    buffer = BytesIO()
+    exif_data = Image.Exif()
+    exif_data[0x010E] = 'secret description'
+    exif_data[0x0112] = 6
+    Image.new('RGB', (16, 8), 'red').save(
+        buffer, format=image_format, exif=exif_data.tobytes()
+    )
+    stripper = MetadataStripper()
+    stripped = stripper.feed(buffer.getvalue()) + stripper.finish()
+    assert b'secret description' not in stripped
+    image = Image.open(BytesIO(stripped))
+    image.load()
+    assert dict(image.getexif()) == {0x0112: 6}
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    'limits',
+    [
+        {'POST_IMAGE_MAX_UPLOAD_SIZE': 100},
+        {'POST_IMAGE_MAX_UPLOAD_SIZE': 100, 'DATA_UPLOAD_MAX_MEMORY_SIZE': 0},
+    ]
+)
+def test_oversize_upload_passes_csrf(user, post_data, tmp_path, limits):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    client.get('/posts/create/')
+    data = {
+        'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+        **post_data,
+        'image': SimpleUploadedFile(
+            'photo.jpg', make_jpeg(64, 64), content_type='image/jpeg'
+        ),
+    }
+    with override_settings(MEDIA_ROOT=tmp_path, **limits):
+        response = client.post('/posts/create/', data=data)
+        assert response.status_code == 200
+        assert 'Файл слишком большой' in response.content.decode()
+        assert not Post.objects.exists()
+
+        del data['csrfmiddlewaretoken']
+        data['image'].seek(0)
+        with override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=10 ** 6,
+                               DATA_UPLOAD_MAX_MEMORY_SIZE=10 ** 6):
+            assert client.post(
+                '/posts/create/', data=data
+            ).status_code == 403
@@ -0,0 +1,49 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.degraded import STALE_PAGE_KEY
+from blog.models import Post
+from blog.warming import RateLimiter, get_hot_urls
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(50)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - started >= 0.08
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_cache_renders_hot_pages(post_with_published_location, mixer):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post, is_published=True)
+    mixer.cycle(11).blend(
+        'blog.Post', author=post.author, category=post.category,
+        location=None, image='', is_published=True,
+        pub_date=post.pub_date - timezone.timedelta(days=1)
+    )
+    tenth = Post.objects.order_by(*Post._meta.ordering)[9].id
+    category = f'/category/{post.category.slug}/'
+    profile = f'/profile/{post.author.username}/'
+    assert get_hot_urls(top=1, pages=2) == [
+        '/', f'/more/?cursor={tenth}', '/?page=2',
+        category, f'{category}more/?cursor={tenth}', f'{category}?page=2',
+        profile, f'{profile}more/?cursor={tenth}', f'{profile}?page=2',
+        f'/posts/{post.id}/',
+    ]
+
+    output = StringIO()
+    call_command('warm_cache', top=1, workers=3, rate=0, stdout=output)
+    assert 'Прогрето адресов: 7 из 7' in output.getvalue()
+    assert cache.get(STALE_PAGE_KEY.format(f'/posts/{post.id}/'))
+
+    output = StringIO()
+    call_command('warm_cache', '/', '/missing/', stdout=output)
+    assert '404' in output.getvalue()
+    assert 'Прогрето адресов: 1 из 2' in output.getvalue()
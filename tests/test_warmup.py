@@ -0,0 +1,21 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.choices import get_choice_rows
+from blog.models import Category
+from blog.warmup import warm_up
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_up(published_category):
+    timings = warm_up()
+    assert set(timings) == {
+        'views', 'templates', 'urls', 'translations', 'caches', 'pages'
+    }
+    assert timings['templates'][0] >= 20
+    assert timings['urls'][0] >= 5
+    with CaptureQueriesContext(connection) as queries:
+        rows = get_choice_rows(Category)
+    assert not queries.captured_queries
+    assert published_category.pk in [row[0] for row in rows]